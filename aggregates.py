@@ -0,0 +1,453 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from caching import SingleFlight
+from data_loader import dataset_version, quantitative_features
+
+# Group keys whose aggregates are built up front; anything else is built on first use
+DEFAULT_GROUP_KEYS = ['region', 'Nation', 'Position', 'League_Nation', 'Gender']
+
+
+def _group_labels(group):
+    # The group order from_frame produces: category order, or sorted values for other dtypes
+    if isinstance(group.dtype, pd.CategoricalDtype):
+        return group.cat.categories
+    return pd.Index(sorted(group.dropna().unique()))
+
+
+def _rows(valid, mask):
+    # Positions of the rows to aggregate: valid ones, and only those in ``mask`` when one is given
+    return np.flatnonzero(valid if mask is None else valid & np.asarray(mask, dtype=bool))
+
+
+def _feature_values(df, features, rows, dtype=np.float64):
+    # (rows x features), gathered column by column from the frame's own arrays: no copy of the frame
+    values = np.empty((len(rows), len(features)), dtype=dtype)
+    for i, feature in enumerate(features):
+        values[:, i] = df[feature].to_numpy()[rows]
+    return values
+
+
+# ---- Group-means cube ----
+class GroupStats:
+    """Count, sum and sum of squares of every quantitative feature per value of one group key.
+
+    Built with a single pass over the players; afterwards any mean, variance or standard error
+    is a slice of a (groups x features) array and never touches the player rows again.
+    """
+
+    def __init__(self, key, labels, features, count, total, total_sq):
+        self.key = key
+        self.labels = list(labels)
+        self.features = list(features)
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self._feature_index = {feature: i for i, feature in enumerate(self.features)}
+
+    @classmethod
+    def from_frame(cls, df, key, features=quantitative_features, mask=None):
+        """Stats of the rows of ``df``, or of those where the boolean ``mask`` is set."""
+        group = df[key]
+        if not isinstance(group.dtype, pd.CategoricalDtype):
+            group = group.astype('category')
+        codes = group.cat.codes.to_numpy()
+        labels = group.cat.categories
+        rows = _rows(codes >= 0, mask)
+        codes = codes[rows]
+        values = _feature_values(df, features, rows)
+
+        k = len(labels)
+        count = np.bincount(codes, minlength=k)
+        total = np.column_stack([np.bincount(codes, weights=col, minlength=k) for col in values.T])
+        total_sq = np.column_stack([np.bincount(codes, weights=col * col, minlength=k) for col in values.T])
+
+        # Keep only the groups that actually occur, like groupby(observed=True)
+        observed = count > 0
+        return cls(key, labels[observed], features, count[observed], total[observed], total_sq[observed])
+
+    def updated(self, df, added, removed):
+        """These stats once ``removed`` rows have left and ``added`` rows have joined; ``df`` is the new frame.
+
+        Only the changed rows are aggregated. Ratings are integers, so the float sums stay exact
+        and the result equals from_frame(df) bit for bit.
+        """
+        labels = _group_labels(df[self.key])
+        k = len(labels)
+        count = np.zeros(k, dtype=np.int64)
+        total = np.zeros((k, len(self.features)))
+        total_sq = np.zeros((k, len(self.features)))
+        parts = [(self, 1), (GroupStats.from_frame(added, self.key, self.features), 1),
+                 (GroupStats.from_frame(removed, self.key, self.features), -1)]
+        for stats, sign in parts:
+            rows = labels.get_indexer(stats.labels)
+            kept = rows >= 0  # a label can only disappear once all its players are gone
+            count[rows[kept]] += sign * stats.count[kept]
+            total[rows[kept]] += sign * stats.total[kept]
+            total_sq[rows[kept]] += sign * stats.total_sq[kept]
+        observed = count > 0
+        return GroupStats(self.key, labels[observed], self.features, count[observed], total[observed],
+                          total_sq[observed])
+
+    def _columns(self, features):
+        return [self._feature_index[feature] for feature in features]
+
+    def _frame(self, values, features):
+        return pd.DataFrame(values, index=pd.Index(self.labels, name=self.key), columns=list(features))
+
+    def mean(self, features):
+        cols = self._columns(features)
+        return self._frame(self.total[:, cols] / self.count[:, None], features)
+
+    def variance(self, features):
+        # Sample variance (ddof=1), NaN for single-player groups
+        cols = self._columns(features)
+        n = self.count[:, None].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (self.total_sq[:, cols] - self.total[:, cols] ** 2 / n) / (n - 1)
+        return self._frame(np.clip(var, 0, None), features)
+
+    def std(self, features):
+        return np.sqrt(self.variance(features))
+
+    def std_error(self, features):
+        return self.std(features).div(np.sqrt(self.count), axis=0)
+
+    def counts(self):
+        return pd.Series(self.count, index=pd.Index(self.labels, name=self.key), name='count')
+
+
+# ---- Age index ----
+class AgeIndex:
+    """Per-age player counts and feature sums as dense arrays, with cumulative sums over age.
+
+    Arrays are shaped (splits x ages x features); without a split there is one split holding
+    everybody. Per-age curves and whole-range summaries for any age window are then array
+    slices, and the all-players view is kept alongside so a split index answers both.
+    """
+
+    def __init__(self, split, split_labels, min_age, features, count, total):
+        self.split = split
+        self.split_labels = list(split_labels)
+        self.min_age = min_age
+        self.max_age = min_age + count.shape[1] - 1
+        self.features = list(features)
+        self._feature_index = {feature: i for i, feature in enumerate(self.features)}
+        self._split_index = {label: i for i, label in enumerate(self.split_labels)}
+
+        # Append the all-splits total as the last split
+        self.count = np.concatenate([count, count.sum(axis=0, keepdims=True)])
+        self.total = np.concatenate([total, total.sum(axis=0, keepdims=True)])
+        zero = np.zeros_like(self.count[:, :1])
+        self.cum_count = np.concatenate([zero, self.count.cumsum(axis=1)], axis=1)
+        zero = np.zeros_like(self.total[:, :1])
+        self.cum_total = np.concatenate([zero, self.total.cumsum(axis=1)], axis=1)
+
+    @classmethod
+    def from_frame(cls, df, split=None, features=quantitative_features, mask=None):
+        """Index of the rows of ``df``, or of those where the boolean ``mask`` is set."""
+        ages = df['Age']
+        valid = ages.notna().to_numpy()
+        if split is None:
+            split_labels = []
+            split_codes = np.zeros(len(df), dtype=np.intp)
+        else:
+            group = df[split]
+            if not isinstance(group.dtype, pd.CategoricalDtype):
+                group = group.astype('category')
+            split_labels = group.cat.categories
+            split_codes = group.cat.codes.to_numpy().astype(np.intp)
+            valid = valid & (split_codes >= 0)
+
+        rows = _rows(valid, mask)
+        age_values = ages.array[rows].to_numpy(dtype=np.float64, na_value=np.nan).astype(np.intp)
+        split_codes = split_codes[rows]
+        values = _feature_values(df, features, rows)
+        n_splits = max(len(split_labels), 1)
+        if not len(rows):
+            # Nobody to aggregate (a filter no player passes): one empty age, so every curve is empty
+            return cls(split, split_labels, 0, features, np.zeros((n_splits, 1), dtype=np.int64),
+                       np.zeros((n_splits, 1, len(features))))
+
+        min_age = int(age_values.min())
+        n_ages = int(age_values.max()) - min_age + 1
+        cell = split_codes * n_ages + (age_values - min_age)
+        size = n_splits * n_ages
+
+        count = np.bincount(cell, minlength=size).reshape(n_splits, n_ages)
+        total = np.stack([np.bincount(cell, weights=col, minlength=size) for col in values.T], axis=-1)
+        total = total.reshape(n_splits, n_ages, len(features))
+        return cls(split, split_labels, min_age, features, count, total)
+
+    def _split_arrays(self):
+        # Per-split arrays without the appended all-splits row
+        return self.count[:-1], self.total[:-1]
+
+    def updated(self, df, added, removed):
+        """This index once ``removed`` rows have left and ``added`` rows have joined; ``df`` is the new frame."""
+        split_labels = _group_labels(df[self.split]) if self.split is not None else pd.Index([])
+        parts = [(self, 1)] + [(AgeIndex.from_frame(rows, self.split, self.features), sign)
+                               for rows, sign in ((added, 1), (removed, -1)) if rows['Age'].notna().any()]
+        min_age = min(index.min_age for index, _ in parts)
+        max_age = max(index.max_age for index, _ in parts)
+
+        n_splits = max(len(split_labels), 1)
+        count = np.zeros((n_splits, max_age - min_age + 1), dtype=np.int64)
+        total = np.zeros(count.shape + (len(self.features),))
+        for index, sign in parts:
+            part_count, part_total = index._split_arrays()
+            rows = split_labels.get_indexer(index.split_labels) if self.split is not None else np.zeros(1, np.intp)
+            kept = rows >= 0
+            ages = slice(index.min_age - min_age, index.max_age - min_age + 1)
+            count[rows[kept], ages] += sign * part_count[kept]
+            total[rows[kept], ages] += sign * part_total[kept]
+
+        # Trim ages nobody has any more, so the range matches from_frame(df)
+        present = np.flatnonzero(count.sum(axis=0))
+        if not len(present):
+            # Nobody left: the one empty age from_frame gives for no rows
+            return AgeIndex(self.split, split_labels, 0, self.features, np.zeros((n_splits, 1), dtype=np.int64),
+                            np.zeros((n_splits, 1, len(self.features))))
+        count = count[:, present[0]:present[-1] + 1]
+        total = total[:, present[0]:present[-1] + 1]
+        return AgeIndex(self.split, split_labels, min_age + int(present[0]), self.features, count, total)
+
+    def _split_row(self, group):
+        if group is None:
+            return len(self.split_labels) if self.split_labels else 0
+        return self._split_index[group]
+
+    def _age_slice(self, lo, hi):
+        # [start, stop) into the age axis, clamped to it; empty when the window misses the data
+        n_ages = self.max_age - self.min_age + 1
+        start = min(max(lo - self.min_age, 0), n_ages)
+        stop = min(max(hi - self.min_age + 1, start), n_ages)
+        return start, stop
+
+    def curve(self, lo, hi, features, group=None):
+        """Mean of each feature per age in [lo, hi], like groupby('Age').mean() on that window."""
+        row = self._split_row(group)
+        start, stop = self._age_slice(lo, hi)
+        cols = [self._feature_index[feature] for feature in features]
+        count = self.count[row, start:stop]
+        observed = count > 0
+        means = self.total[row, start:stop][:, cols][observed] / count[observed, None]
+        ages = np.arange(self.min_age + start, self.min_age + stop)[observed]
+        return pd.DataFrame(means, index=pd.Index(ages, name='Age'), columns=list(features))
+
+    def range_mean(self, lo, hi, features, group=None):
+        """Mean of each feature over all players aged lo..hi (inclusive)."""
+        row = self._split_row(group)
+        start, stop = self._age_slice(lo, hi)
+        cols = [self._feature_index[feature] for feature in features]
+        n = self.cum_count[row, stop] - self.cum_count[row, start]
+        sums = self.cum_total[row, stop, cols] - self.cum_total[row, start, cols]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(sums / n, index=list(features))
+
+    def range_count(self, lo, hi, group=None):
+        row = self._split_row(group)
+        start, stop = self._age_slice(lo, hi)
+        return int(self.cum_count[row, stop] - self.cum_count[row, start])
+
+
+# ---- Bootstrap confidence intervals ----
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_SEED = 2024
+# Resamples are drawn in blocks sized so a block's scratch arrays stay within this budget
+BOOTSTRAP_MEMORY_BYTES = 64 << 20
+_DRAW_BYTES = 20  # per (resample, player): a uint64 pick, its int64 bincount and a float32 weight
+
+
+def resample_block(n, budget=BOOTSTRAP_MEMORY_BYTES):
+    return max(1, budget // (_DRAW_BYTES * max(n, 1)))
+
+
+class BootstrapCI:
+    """Percentile bootstrap 95% interval of every feature's mean, per value of one group key.
+
+    Each resample redraws every group's players with replacement. A block of resamples is drawn
+    in one vectorized pass: 32 random bits per row slot pick a row of that slot's group, a
+    bincount turns the picks into per-row weights, and one matrix product per group sums all
+    features at once. The block size only bounds memory: the generator is seeded and its draws
+    come in the same order whatever the block, so a dataset version always gets the same intervals.
+    """
+
+    def __init__(self, key, labels, features, lo, hi):
+        self.key = key
+        self.labels = list(labels)
+        self.features = list(features)
+        self.lo = lo
+        self.hi = hi
+        self._feature_index = {feature: i for i, feature in enumerate(self.features)}
+
+    @classmethod
+    def from_frame(cls, df, key, features=quantitative_features, resamples=BOOTSTRAP_RESAMPLES,
+                   seed=BOOTSTRAP_SEED, mask=None):
+        """Intervals over the rows of ``df``, or over those where the boolean ``mask`` is set."""
+        group = df[key]
+        if not isinstance(group.dtype, pd.CategoricalDtype):
+            group = group.astype('category')
+        codes = group.cat.codes.to_numpy()
+        rows = _rows(codes >= 0, mask)
+        order = np.argsort(codes[rows], kind='stable')
+        rows = rows[order]
+        codes = codes[rows]
+        values = _feature_values(df, features, rows, np.float32)
+
+        # Rows are now contiguous per group; slot i of a resample is drawn from the group of row i
+        sizes = np.bincount(codes, minlength=len(group.cat.categories))
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        observed = np.flatnonzero(sizes)
+        slot_size = sizes[codes].astype(np.uint64)
+        slot_start = starts[codes]
+        n = len(codes)
+        if not n:
+            empty = np.empty((0, len(features)))
+            return cls(key, [], features, empty, empty)
+
+        rng = np.random.default_rng(seed)
+        sums = []
+        step = resample_block(n)
+        for first in range(0, resamples, step):
+            block = min(step, resamples - first)
+            # In place: a row within the slot's group, offset to a flat (resample, row) index
+            picks = rng.integers(0, 1 << 32, (block, n), dtype=np.uint64)
+            picks *= slot_size
+            picks >>= 32
+            picks = picks.view(np.int64)
+            picks += slot_start
+            picks += (np.arange(block) * n)[:, None]
+            weights = np.bincount(picks.ravel(), minlength=block * n).reshape(block, n).astype(np.float32)
+            sums.append(np.stack([weights[:, start:start + size] @ values[start:start + size]
+                                  for start, size in zip(starts[observed], sizes[observed])], axis=1))
+        means = np.concatenate(sums) / sizes[observed][None, :, None]
+        lo, hi = np.percentile(means, [2.5, 97.5], axis=0)
+        return cls(key, group.cat.categories[observed], features, lo, hi)
+
+    def interval(self, features):
+        """(lower, upper) frames of groups x features, laid out like GroupStats.mean."""
+        cols = [self._feature_index[feature] for feature in features]
+        index = pd.Index(self.labels, name=self.key)
+        return (pd.DataFrame(self.lo[:, cols], index=index, columns=list(features)),
+                pd.DataFrame(self.hi[:, cols], index=index, columns=list(features)))
+
+
+# ---- Per-dataset-version store ----
+# version -> {(name, key): value}. The previous version is kept too, so a session still
+# finishing a rerun on it does not throw away the entries of the new one.
+_store = OrderedDict()
+_store_lock = threading.RLock()
+_builds = SingleFlight()
+KEEP_VERSIONS = 2
+
+
+def _entries(version):
+    entries = _store.get(version)
+    if entries is None:
+        entries = _store[version] = {}
+        while len(_store) > KEEP_VERSIONS:
+            _store.popitem(last=False)
+    return entries
+
+
+def cached(df, name, key, build):
+    """Return ``build()`` memoized under (name, key) until the dataset version changes.
+
+    The build runs outside the store lock, once per entry: a slow one (a bootstrap on the warm
+    thread) holds up only the callers waiting for that same entry.
+    """
+    version = dataset_version(df)
+    with _store_lock:
+        entries = _entries(version)
+        if (name, key) in entries:
+            return entries[(name, key)]
+    return _builds.run((version, name, key), lambda: _build(version, name, key, build))
+
+
+def _build(version, name, key, build):
+    with _store_lock:
+        entries = _store.get(version, {})
+        if (name, key) in entries:
+            return entries[(name, key)]  # stored while this caller was waiting for the lock
+    value = build()
+    with _store_lock:
+        # The version may have been dropped during the build; it is not brought back
+        entries = _store.get(version)
+        return value if entries is None else entries.setdefault((name, key), value)
+
+
+# name -> update(value, key, df, added, removed) returning the entry for the new frame.
+# Entries without an updater (trend tables, league lists...) are cheap and rebuilt on demand.
+_updaters = {
+    'group_stats': lambda stats, key, df, added, removed: stats.updated(df, added, removed),
+    'age_index': lambda index, split, df, added, removed: index.updated(df, added, removed),
+}
+
+
+def register_updater(name, update):
+    _updaters[name] = update
+
+
+def advance(old_df, df, added, removed):
+    """Carry the cached aggregates of ``old_df`` over to ``df`` by applying only the changed rows.
+
+    ``removed`` holds the rows of ``old_df`` that are gone or were replaced, ``added`` the rows
+    of ``df`` that are new or replace them.
+    """
+    with _store_lock:
+        old_entries = dict(_store.get(dataset_version(old_df), {}))
+    # The updates run outside the lock so that page queries are not held up meanwhile
+    updated = {(name, key): _updaters[name](value, key, df, added, removed)
+               for (name, key), value in old_entries.items() if name in _updaters}
+    with _store_lock:
+        entries = _entries(dataset_version(df))
+        for name_key, value in updated.items():
+            entries.setdefault(name_key, value)  # keep entries built from df in the meantime
+
+
+def group_stats(df, key):
+    """Return the cached GroupStats for ``key`` on this version of the dataset."""
+    return cached(df, 'group_stats', key, lambda: GroupStats.from_frame(df, key))
+
+
+def age_index(df, split=None):
+    """Return the cached AgeIndex (optionally split by another column) for this dataset version."""
+    return cached(df, 'age_index', split, lambda: AgeIndex.from_frame(df, split))
+
+
+def bootstrap_ci(df, key):
+    """Return the cached BootstrapCI for ``key`` on this version of the dataset."""
+    return cached(df, 'bootstrap_ci', key, lambda: BootstrapCI.from_frame(df, key))
+
+
+def warm_group_stats(df, keys=DEFAULT_GROUP_KEYS):
+    for key in keys:
+        group_stats(df, key)
+    age_index(df)
+
+
+# ---- Bootstrap report ----
+def report():
+    import time
+
+    from data_loader import load_ratings
+
+    df = load_ratings()
+    print(f"{'group key':<10} {'groups':>7} {'features':>9} {'resamples':>10} {'cold':>11} {'cached':>11}")
+    for key in ('region', 'Age'):
+        start = time.perf_counter()
+        ci = bootstrap_ci(df, key)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        bootstrap_ci(df, key).interval(quantitative_features)
+        warm = time.perf_counter() - start
+        print(f"{key:<10} {len(ci.labels):>7} {len(ci.features):>9} {BOOTSTRAP_RESAMPLES:>10} "
+              f"{cold * 1000:>8.1f} ms {warm * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    report()
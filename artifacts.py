@@ -0,0 +1,198 @@
+"""Offline build of the precomputed page aggregates.
+
+    python artifacts.py build [--source ratings.csv] [--out artifacts/] [--workers N]
+
+writes into the output directory:
+
+    group_stats-<key>.npz    per-group counts and sums (Africa page, and any other group mean)
+    age_index.npz            per-age counts and sums (Ages page)
+    regression.npz           per (Gender, League_Nation) regression statistics (Men vs Women page)
+    manifest.json            source digest, builder hash and the sha1 of every artifact
+
+The CSV is parsed once, into a scratch Parquet file that each stale artifact's worker
+process reads back and that is removed afterwards. An artifact is rebuilt only when the
+source CSV, the code that builds it, or the file itself has changed. At start-up the
+dashboard seeds its aggregate cache from the artifacts in DASHBOARD_ARTIFACTS_DIR. It does
+so only when the manifest matches the loaded dataset, and skips stale or damaged files.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from aggregates import DEFAULT_GROUP_KEYS, AgeIndex, GroupStats, cached
+from data_loader import BASE_DIR, MAIN_DATA_PATH, dataset_version, file_digest, load_ratings
+from manifests import file_matches, read_manifest, source_hash, write_atomic, write_manifest
+from regression import PairStats, _cell_stats
+
+ARTIFACTS_DIR = os.environ.get('DASHBOARD_ARTIFACTS_DIR', os.path.join(BASE_DIR, 'artifacts'))
+# Typed dataset handed to the worker processes, deleted once they are done
+SCRATCH_DATASET = 'ratings.parquet.tmp'
+# Code whose changes invalidate the artifacts
+BUILDER_SOURCES = ['data_loader.py', 'player_tags.py', 'enrichment.py', 'aggregates.py', 'regression.py',
+                   'artifacts.py']
+
+
+def builder_hash():
+    return source_hash(BUILDER_SOURCES)
+
+
+# ---- Serialization ----
+def _strings(values):
+    return np.array([str(value) for value in values], dtype=str)
+
+
+def _save_group_stats(stats, f):
+    np.savez(f, labels=_strings(stats.labels), features=_strings(stats.features), count=stats.count,
+             total=stats.total, total_sq=stats.total_sq)
+
+
+def _load_group_stats(key, f):
+    with np.load(f) as data:
+        return GroupStats(key, data['labels'].tolist(), data['features'].tolist(), data['count'], data['total'],
+                          data['total_sq'])
+
+
+def _save_age_index(index, f):
+    count, total = index._split_arrays()
+    np.savez(f, min_age=index.min_age, features=_strings(index.features), count=count, total=total)
+
+
+def _load_age_index(f):
+    with np.load(f) as data:
+        return AgeIndex(None, [], int(data['min_age']), data['features'].tolist(), data['count'], data['total'])
+
+
+def _save_cells(cells, f):
+    stats = list(cells.values())
+    np.savez(f, genders=_strings(g for g, _ in cells), leagues=_strings(league for _, league in cells),
+             features=_strings(stats[0].features), n=np.array([s.n for s in stats]),
+             total=np.stack([s.total for s in stats]), cross=np.stack([s.cross for s in stats]),
+             lo=np.stack([s.lo for s in stats]), hi=np.stack([s.hi for s in stats]),
+             counts=np.stack([s.counts for s in stats]))
+
+
+def _load_cells(f):
+    with np.load(f) as data:
+        features = data['features'].tolist()
+        return {(gender, league): PairStats(features, int(n), total, cross, lo, hi, counts)
+                for gender, league, n, total, cross, lo, hi, counts in zip(
+                    data['genders'].tolist(), data['leagues'].tolist(), data['n'], data['total'], data['cross'],
+                    data['lo'], data['hi'], data['counts'])}
+
+
+# artifact -> (aggregate cache entry it seeds, build(df), save(value, file), load(file))
+ARTIFACTS = {
+    **{f'group_stats-{key}': (('group_stats', key), partial(GroupStats.from_frame, key=key), _save_group_stats,
+                              partial(_load_group_stats, key))
+       for key in DEFAULT_GROUP_KEYS},
+    'age_index': (('age_index', None), AgeIndex.from_frame, _save_age_index, _load_age_index),
+    'regression': (('regression', 'cells'), _cell_stats, _save_cells, _load_cells),
+}
+
+# ---- Build ----
+def _file_name(name):
+    return f"{name}.npz"
+
+
+def read_dataset(path, version):
+    df = pd.read_parquet(path)
+    df.attrs['dataset_version'] = version
+    return df
+
+
+def _build_artifact(name, dataset, out_dir, version):
+    start = time.perf_counter()
+    df = read_dataset(dataset, version)
+    _, build, save, _ = ARTIFACTS[name]
+    value = build(df)
+    sha1 = write_atomic(os.path.join(out_dir, _file_name(name)), partial(save, value))
+    return name, sha1, time.perf_counter() - start
+
+
+def _up_to_date(manifest, name, out_dir, source_digest):
+    if manifest is None or manifest.get('source_digest') != source_digest or manifest.get('builder') != builder_hash():
+        return False
+    entry = manifest['artifacts'].get(name)
+    path = os.path.join(out_dir, _file_name(name))
+    return entry is not None and file_matches(path, entry['sha1'])
+
+
+def build(source=MAIN_DATA_PATH, out_dir=ARTIFACTS_DIR, workers=None):
+    """Build every stale artifact for ``source`` into ``out_dir``; returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    source_digest = file_digest(source)
+    manifest = read_manifest(out_dir)
+    artifacts = {}
+
+    stale = []
+    for name in ARTIFACTS:
+        if _up_to_date(manifest, name, out_dir, source_digest):
+            artifacts[name] = manifest['artifacts'][name]
+            print(f"{name:<24} up to date")
+        else:
+            stale.append(name)
+    if stale:
+        start = time.perf_counter()
+        dataset = os.path.join(out_dir, SCRATCH_DATASET)
+        load_ratings(source, use_snapshot=False).to_parquet(dataset, index=False)
+        print(f"{'dataset':<24} {(time.perf_counter() - start) * 1000:>8.0f} ms")
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for name, sha1, seconds in pool.map(
+                        partial(_build_artifact, dataset=dataset, out_dir=out_dir, version=source_digest), stale):
+                    artifacts[name] = dict(file=_file_name(name), sha1=sha1)
+                    print(f"{name:<24} {seconds * 1000:>8.0f} ms")
+        finally:
+            os.remove(dataset)
+
+    manifest = dict(source=os.path.basename(source), source_digest=source_digest, builder=builder_hash(),
+                    artifacts=artifacts)
+    write_manifest(out_dir, manifest)
+    return manifest
+
+
+# ---- Dashboard side ----
+def seed_cache(df, out_dir=ARTIFACTS_DIR):
+    """Load the prebuilt aggregates for ``df`` into the aggregate cache; returns the names loaded.
+
+    Runs once per dataset version. Artifacts built from another version of the CSV or by
+    other code, and files whose hash no longer matches, are skipped and computed as usual.
+    """
+    def load():
+        manifest = read_manifest(out_dir)
+        if manifest is None or manifest.get('source_digest') != dataset_version(df):
+            return []
+        if manifest.get('builder') != builder_hash():
+            return []
+        loaded = []
+        for name, entry in manifest['artifacts'].items():
+            path = os.path.join(out_dir, entry['file'])
+            if name not in ARTIFACTS or not file_matches(path, entry['sha1']):
+                continue
+            (cache_name, key), _, _, load_artifact = ARTIFACTS[name]
+            cached(df, cache_name, key, partial(load_artifact, path))
+            loaded.append(name)
+        return loaded
+
+    return cached(df, 'artifacts', out_dir, load)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--source', default=MAIN_DATA_PATH, help="ratings CSV (default: the bundled file)")
+    parser.add_argument('--out', default=ARTIFACTS_DIR, help="output directory (default: artifacts/)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    build(args.source, args.out, args.workers)
+    print(f"{'total':<24} {(time.perf_counter() - start) * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
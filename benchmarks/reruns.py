@@ -0,0 +1,191 @@
+"""Headless rerun benchmark: drives each page through scripted widget changes with AppTest.
+
+For every rerun it records wall time, process RSS (current and peak) and the bytes of the
+Plotly spec sent to the browser. Each dataset runs in its own process so memory numbers do
+not leak between sizes. Results go to a JSON file that can be compared across commits:
+
+    python benchmarks/reruns.py --scale 1 --scale 10 --scale 100 --out results/new.json
+    python benchmarks/reruns.py --compare results/old.json results/new.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+sys.path.insert(0, ROOT)
+
+
+# ---- Scripted interactions ----
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def _set(kind, label, value):
+    def step(at):
+        _widget(getattr(at, kind), label).set_value(value)
+    return step
+
+
+# page -> [(step name, action)]; the first step opens the page with its defaults
+scenarios = {
+    "Africa": [
+        ("open", None),
+        ("all features", _set('multiselect', "Select Feature:", ['All'])),
+        ("all + error bars", _set('checkbox', "Show 95% confidence intervals", True)),
+        ("error bars off", _set('checkbox', "Show 95% confidence intervals", False)),
+        ("single feature", _set('multiselect', "Select Feature:", ['Pace'])),
+        ("PlayStyle filter", _set('multiselect', "Has all of these PlayStyles:", ['Rapid', 'Flair'])),
+        ("filter off", _set('multiselect', "Has all of these PlayStyles:", [])),
+        ("back to default", _set('multiselect', "Select Feature:", ['Pace', 'Stamina', 'Strength', 'Aggression'])),
+    ],
+    "Men vs Women": [
+        ("open", None),
+        ("all leagues", _set('multiselect', "Select Leagues:", ['All'])),
+        ("women only", _set('selectbox', "Filter by Gender:", "Women")),
+        ("men only", _set('selectbox', "Filter by Gender:", "Men")),
+        ("x axis Pace", _set('selectbox', "Select X-axis Attribute:", "Pace")),
+        ("aggregated", _set('radio', "Point Detail:", "Aggregated")),
+        ("position filter", _set('multiselect', "Can play any of these positions:", ['LW', 'RW'])),
+        ("filter off", _set('multiselect', "Can play any of these positions:", [])),
+        ("back to default", _set('selectbox', "Select X-axis Attribute:", "Aggression")),
+    ],
+    "Ages": [
+        ("open", None),
+        ("narrow range", _set('slider', "Select Age Range:", (24, 31))),
+        ("all features", _set('multiselect', "Select features:", ['All'])),
+        ("all + error bars", _set('checkbox', "Show 95% confidence intervals", True)),
+        ("PlayStyle filter", _set('multiselect', "Has all of these PlayStyles:", ['Rapid', 'Flair'])),
+        ("filter off", _set('multiselect', "Has all of these PlayStyles:", [])),
+        ("full range", _set('slider', "Select Age Range:", (17, 43))),
+    ],
+}
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _payload_bytes(at):
+    charts = at.get('plotly_chart')
+    return sum(len(chart.proto.spec) for chart in charts)
+
+
+def run_dataset(data_path):
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    for page, steps in scenarios.items():
+        at = AppTest.from_file(os.path.join(ROOT, "streamlit_dashboard.py"), default_timeout=600)
+        at.session_state["page"] = page
+        for step, action in steps:
+            if action is not None:
+                action(at)
+            start = time.perf_counter()
+            at.run()
+            wall = time.perf_counter() - start
+            if at.exception:
+                raise RuntimeError(f"{page} / {step}: {at.exception[0].message}")
+            results.append(dict(page=page, step=step, wall_s=wall, payload_bytes=_payload_bytes(at),
+                                rss_bytes=_rss_bytes(), peak_rss_bytes=_peak_rss_bytes()))
+    return results
+
+
+# ---- Driver ----
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dataset_path(scale):
+    if scale == 1:
+        from data_loader import MAIN_DATA_PATH
+        return MAIN_DATA_PATH
+    from benchmarks.synthetic import ensure
+    return ensure(scale)
+
+
+def run_scale(scale):
+    data_path = _dataset_path(scale)
+    env = dict(os.environ, DASHBOARD_DATA_PATH=data_path)
+    proc = subprocess.run([sys.executable, __file__, '--child', data_path], cwd=ROOT, env=env, check=True,
+                          capture_output=True, text=True)
+    rows = json.loads(proc.stdout.strip().splitlines()[-1])
+    for row in rows:
+        row['dataset'] = f"x{scale}"
+    return rows
+
+
+def _key(row):
+    return row['dataset'], row['page'], row['step']
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {_key(row): row for row in json.load(f)['results']}
+    with open(new_path) as f:
+        new = json.load(f)['results']
+    print(f"{'dataset':<8} {'page':<13} {'step':<16} {'old':>9} {'new':>9} {'ratio':>7} {'payload':>9}")
+    for row in new:
+        before = old.get(_key(row))
+        if before is None:
+            continue
+        ratio = row['wall_s'] / before['wall_s'] if before['wall_s'] else float('nan')
+        payload = row['payload_bytes'] / before['payload_bytes'] if before['payload_bytes'] else float('nan')
+        print(f"{row['dataset']:<8} {row['page']:<13} {row['step']:<16} {before['wall_s'] * 1000:>6.0f} ms "
+              f"{row['wall_s'] * 1000:>6.0f} ms {ratio:>6.2f}x {payload:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, action='append',
+                        help="dataset size as a multiple of the real file (default: 1 10 100)")
+    parser.add_argument('--out', help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_dataset(args.child)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = _git_commit()
+    results = []
+    for scale in args.scale or [1, 10, 100]:
+        rows = run_scale(scale)
+        for row in rows:
+            print(f"{row['dataset']:<6} {row['page']:<13} {row['step']:<16} {row['wall_s'] * 1000:>8.0f} ms "
+                  f"{row['payload_bytes'] / 1024:>9.0f} KB {row['peak_rss_bytes'] / 2 ** 20:>7.0f} MB peak")
+        results.extend(rows)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(dict(commit=commit, created=datetime.datetime.now().isoformat(timespec='seconds'),
+                       python=platform.python_version(), results=results), f, indent=1)
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Concurrent-session load test: process RSS as more browser sessions share one server.
+
+Each session is an AppTest instance (its own script run and session state) kept alive for
+the whole run, the way open browser tabs are. All sessions live in one process, so they
+share whatever the app caches at module level. At every step more sessions are opened and
+every open session visits each page in turn (AppTest is not thread-safe, so reruns are
+interleaved rather than simultaneous); current and peak RSS are sampled after each step.
+With one shared dataset and per-session index arrays RSS should stay roughly flat:
+
+    python benchmarks/sessions.py --sessions 1 2 4 8 16 32
+    python benchmarks/sessions.py --root /path/to/older/checkout   # same test on another tree
+"""
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_VISITS = ["Africa", "Men vs Women", "Ages"]
+
+
+def _rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _peak_rss_bytes():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _visit(at, page):
+    at.sidebar.radio[0].set_value(page)
+    at.run()
+    if page == "Men vs Women":
+        # A different league selection in every session, so nothing is served from another session's work
+        options = [o for o in at.multiselect[0].options if o != 'All']
+        at.multiselect[0].set_value([options[id(at) % len(options)]])
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+
+
+def _session(root):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(root, "streamlit_dashboard.py"), default_timeout=600)
+    at.run()
+    return at
+
+
+def run(root, counts):
+    sessions = []
+    rows = []
+    for count in counts:
+        sessions += [_session(root) for _ in range(count - len(sessions))]
+        start = time.perf_counter()
+        for page in PAGE_VISITS:
+            for at in sessions:
+                _visit(at, page)
+        wall = time.perf_counter() - start
+        gc.collect()
+        rows.append(dict(sessions=len(sessions), rss_bytes=_rss_bytes(), peak_rss_bytes=_peak_rss_bytes(),
+                         wall_s=wall))
+        row = rows[-1]
+        print(f"{row['sessions']:>8} {row['rss_bytes'] / 2 ** 20:>9.0f} MB "
+              f"{(row['rss_bytes'] - rows[0]['rss_bytes']) / 2 ** 20:>+9.0f} MB "
+              f"{row['peak_rss_bytes'] / 2 ** 20:>9.0f} MB {wall:>8.1f} s", flush=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                        help="open-session counts to step through (default: 1 2 4 8 16 32)")
+    parser.add_argument('--root', default=ROOT, help="checkout whose streamlit_dashboard.py is served")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    os.chdir(root)  # older trees read the CSV relative to the working directory
+    sys.path.insert(0, root)
+    print(f"{'sessions':>8} {'rss':>12} {'vs first':>12} {'peak':>12} {'reruns':>10}")
+    run(root, sorted(args.sessions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Similar-players benchmark: index build time and top-10 query latency with each kind of filter.
+
+Runs on the bundled CSV, or on any ratings file with the same columns (a synthetic copy from
+benchmarks/synthetic.py for larger datasets). Results go to a JSON file:
+
+    python benchmarks/similarity.py [ratings.csv] [--queries N] [--out results/similarity.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+sys.path.insert(0, ROOT)
+
+from data_loader import MAIN_DATA_PATH, load_ratings  # noqa: E402
+from similarity import SimilarityIndex  # noqa: E402
+
+K = 10
+
+
+def _cases(df):
+    gender = df['Gender'].value_counts().index[0]  # the larger side: the slower filter
+    return {
+        'unfiltered': {},
+        'gender': dict(gender=gender),
+        'leagues': dict(leagues=['England', 'Germany']),
+        'age band': dict(age_range=(20, 25)),
+        'gender+leagues+age': dict(gender=gender, leagues=['England', 'Germany'], age_range=(20, 25)),
+    }
+
+
+def run(path, queries):
+    df = load_ratings(path)
+    start = time.perf_counter()
+    index = SimilarityIndex.from_frame(df)
+    build = dict(case='build', players=len(index), vectors_bytes=index.vectors.nbytes,
+                 build_s=time.perf_counter() - start)
+    print(f"{'build':<22} {build['build_s'] * 1000:>9.1f} ms  "
+          f"({len(index)} players, {index.vectors.nbytes / 2 ** 20:.1f} MB)")
+
+    rows = np.random.default_rng(0).integers(0, len(index), queries)
+    results = [build]
+    print(f"{f'query (k={K})':<22} {'p50':>12} {'p95':>12}")
+    for label, filters in _cases(df).items():
+        times = []
+        for row in rows:
+            start = time.perf_counter()
+            index.query(row, K, **filters)
+            times.append(time.perf_counter() - start)
+        p50, p95 = np.percentile(times, [50, 95])
+        results.append(dict(case=label, queries=queries, k=K, p50_s=p50, p95_s=p95))
+        print(f"{label:<22} {p50 * 1000:>9.2f} ms {p95 * 1000:>9.2f} ms")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', default=MAIN_DATA_PATH, help="ratings CSV (default: the bundled file)")
+    parser.add_argument('--queries', type=int, default=200, help="queries per filter case (default: 200)")
+    parser.add_argument('--out', help="results file (default: benchmarks/results/similarity-<commit>.json)")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = run(args.path, args.queries)
+    out = args.out or os.path.join(RESULTS_DIR, f"similarity-{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(dict(commit=commit, created=datetime.datetime.now().isoformat(timespec='seconds'),
+                       python=platform.python_version(), dataset=os.path.basename(args.path), results=results),
+                  f, indent=1)
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start report: import time and time to first paint for each page, one fresh process per page.
+
+    python benchmarks/startup.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Home", "Africa", "Men vs Women", "Ages"]
+WATCHED_MODULES = ['pandas', 'numpy', 'pyarrow', 'plotly.express', 'sklearn']
+
+
+def child(page):
+    process_start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    streamlit_imported = time.perf_counter()
+
+    sys.path.insert(0, ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, "streamlit_dashboard.py"), default_timeout=120)
+    at.session_state["page"] = page
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    done = time.perf_counter()
+
+    import views
+    timings = views.startup_timings[page]
+    print(json.dumps(dict(
+        page=page,
+        streamlit_import_s=streamlit_imported - process_start,
+        page_import_s=timings['import_s'],
+        first_paint_s=timings['first_paint_s'],
+        rerun_s=done - streamlit_imported,
+        loaded_modules=[m for m in WATCHED_MODULES if m in sys.modules],
+    )))
+
+
+def run_page(page):
+    out = subprocess.run([sys.executable, __file__, '--child', page], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--repeat', type=int, default=3, help="fresh processes per page; the median is reported")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    print(f"{'page':<14} {'streamlit':>10} {'page import':>12} {'first paint':>12} {'full rerun':>11}  modules loaded")
+    for page in PAGES:
+        runs = sorted((run_page(page) for _ in range(args.repeat)), key=lambda r: r['first_paint_s'])
+        r = runs[len(runs) // 2]
+        print(f"{page:<14} {r['streamlit_import_s'] * 1000:>7.0f} ms {r['page_import_s'] * 1000:>9.0f} ms "
+              f"{r['first_paint_s'] * 1000:>9.0f} ms {r['rerun_s'] * 1000:>8.0f} ms  {', '.join(r['loaded_modules'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Generate larger ratings files with the same schema as ea_sports_fc_player_ratings.csv.
+
+Rows are resampled from the real file with small perturbations, so category frequencies and
+attribute correlations stay realistic:
+
+    python benchmarks/synthetic.py --scale 10 --scale 100
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import BIRTHDATE_FORMAT, MAIN_DATA_PATH, read_ratings_csv, uint8_columns  # noqa: E402
+from player_tags import decode_tags  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+
+
+def synthetic_path(scale, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"ratings_x{scale}.csv")
+
+
+def generate(scale, seed=0, source=MAIN_DATA_PATH):
+    rng = np.random.default_rng(seed)
+    real = read_ratings_csv(source)
+    n = len(real) * scale
+    rows = rng.integers(0, len(real), size=n)
+    df = real.iloc[rows].reset_index(drop=True)
+
+    # Jitter every rating by up to +-3 and every birthdate by up to a year
+    for col in uint8_columns:
+        values = df[col].to_numpy(dtype=np.int16) + rng.integers(-3, 4, size=n, dtype=np.int16)
+        df[col] = np.clip(values, 1, 99 if col not in ('Height', 'Weight') else 255).astype(np.uint8)
+    df['Skill Moves'] = df['Skill Moves'].clip(1, 5)
+    df['Weak Foot'] = df['Weak Foot'].clip(1, 5)
+    df['Birthdate'] = df['Birthdate'] + pd.to_timedelta(rng.integers(-182, 183, size=n), unit='D')
+    df['Name'] = df['Name'] + ' #' + pd.Series(np.arange(n) // len(real), dtype='string')
+    return df
+
+
+def write(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    out = decode_tags(df)
+    out['Birthdate'] = out['Birthdate'].dt.strftime(BIRTHDATE_FORMAT)
+    out.to_csv(path, index=False)
+
+
+def ensure(scale):
+    """Path to the synthetic file for ``scale``, generating it on first use."""
+    path = synthetic_path(scale)
+    if not os.path.exists(path):
+        write(generate(scale), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, action='append', required=True, help="size multiple of the real file")
+    parser.add_argument('--force', action='store_true', help="regenerate even if the file exists")
+    args = parser.parse_args()
+    for scale in args.scale:
+        path = synthetic_path(scale)
+        if args.force or not os.path.exists(path):
+            write(generate(scale), path)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Thread-safe building blocks for the in-process caches.
+
+SingleFlight runs a build at most once at a time per key: the first caller builds, outside
+any cache lock, and callers asking for the same key meanwhile wait for its result. Lookups
+of other keys are never held up by a slow build.
+
+LRUCache is bounded by the total size of its values, measured by a ``size`` function.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_MISSING = object()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, build):
+        """Return ``build()``, or the result of the build of ``key`` already in progress."""
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = build()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class LRUCache:
+    """LRU cache bounded by the total ``size(value)`` of the stored values."""
+
+    def __init__(self, max_bytes, size=len):
+        self.max_bytes = max_bytes
+        self.size = size
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.size(value)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._flights.run(key, lambda: self._build(key, build))
+        return value
+
+    def _build(self, key, build):
+        # The previous build of this key may have finished between our miss and this call
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry[0]
+        value = build()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                        entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
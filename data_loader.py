@@ -0,0 +1,196 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+from enrichment import enrich
+from instrumentation import span
+from player_tags import encode_tags, tag_columns
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# DASHBOARD_DATA_PATH points the app at another ratings file with the same columns
+MAIN_DATA_PATH = os.environ.get('DASHBOARD_DATA_PATH', os.path.join(BASE_DIR, "ea_sports_fc_player_ratings.csv"))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, ".cache")
+SNAPSHOT_SCHEMA = 2  # bumped whenever read_ratings_csv changes the columns it produces
+
+# Quantitative features
+quantitative_features = [
+    'Pace', 'Shooting', 'Passing', 'Dribbling', 'Defending', 'Physical', 'Acceleration', 'Agility',
+    'Jumping', 'Stamina', 'Strength', 'Aggression', 'Balance', 'Ball Control', 'Composure',
+    'Crossing', 'Curve', 'Defensive Awareness', 'Finishing', 'Free Kick Accuracy', 'GK Diving',
+    'GK Handling', 'GK Kicking', 'GK Positioning', 'GK Reflexes', 'Heading Accuracy', 'Interceptions',
+    'Long Passing', 'Long Shots', 'Penalties', 'Positioning', 'Reactions', 'Short Passing',
+    'Shot Power', 'Sliding Tackle', 'Sprint Speed', 'Standing Tackle', 'Vision', 'Volleys'
+]
+non_gk_features = [feat for feat in quantitative_features if not feat.startswith('GK ')]
+
+# ---- Schema ----
+# Every rating in the file is an integer between 0 and 99 (height in cm tops out around 210),
+# so a single byte per value is enough.
+uint8_columns = ['Rating', 'Height', 'Weight', 'Skill Moves', 'Weak Foot'] + quantitative_features
+category_columns = ['Position', 'Team', 'Nation', 'Gender', 'Preferred Foot']
+text_columns = ['Name']
+# Comma-separated lists, read as text and turned into bitsets at parse time (see player_tags)
+tag_text_columns = list(tag_columns)
+
+csv_dtypes = {col: 'uint8' for col in uint8_columns}
+csv_dtypes.update({col: 'category' for col in category_columns})
+csv_dtypes.update({col: 'string' for col in text_columns + tag_text_columns})
+
+BIRTHDATE_FORMAT = '%m/%d/%Y'
+
+
+# ---- Parsing ----
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_ratings_csv(path=MAIN_DATA_PATH):
+    df = pd.read_csv(path, dtype=csv_dtypes, encoding='utf-8-sig')
+    df['Birthdate'] = pd.to_datetime(df['Birthdate'], format=BIRTHDATE_FORMAT, errors='coerce')
+    return encode_tags(df)
+
+
+# ---- Columnar snapshot ----
+# ratings-<source>-<content>-v<schema>.parquet, where <source> hashes the CSV's path, so
+# every snapshot left behind by an older version of the same file can be found and removed.
+# Names without the source part predate it and are never read again.
+_OLD_SNAPSHOT = re.compile(r'ratings-[0-9a-f]{16}(-v\d+)?\.parquet$')
+
+
+def _source_key(path):
+    return hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+
+
+def snapshot_path(path, digest, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"ratings-{_source_key(path)}-{digest[:16]}-v{SNAPSHOT_SCHEMA}.parquet")
+
+
+def prune_snapshots(path, keep, snapshot_dir=SNAPSHOT_DIR):
+    """Remove the snapshots of other versions of ``path`` (and old-style names), keeping ``keep``."""
+    prefix = f"ratings-{_source_key(path)}-"
+    for name in os.listdir(snapshot_dir):
+        stale = (name.startswith(prefix) and name.endswith('.parquet')) or _OLD_SNAPSHOT.match(name)
+        if stale and os.path.join(snapshot_dir, name) != keep:
+            try:
+                os.remove(os.path.join(snapshot_dir, name))
+            except OSError:
+                pass  # already gone, or removed by another process
+
+
+def write_snapshot(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so a concurrent reader never sees a half-written snapshot
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    return pd.read_parquet(path)
+
+
+# ---- Shared, memoized dataset ----
+# One frame per CSV path, shared by every session of the app. Pages must treat it as read-only.
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _load_uncached(path, digest, use_snapshot, snapshot_dir):
+    if not use_snapshot:
+        return read_ratings_csv(path)
+
+    snap = snapshot_path(path, digest, snapshot_dir)
+    if os.path.exists(snap):
+        try:
+            return read_snapshot(snap)
+        except Exception:
+            pass  # unreadable snapshot, fall back to the CSV and rewrite it
+
+    df = read_ratings_csv(path)
+    try:
+        write_snapshot(df, snap)
+        prune_snapshots(path, snap, snapshot_dir)
+    except (OSError, ImportError):
+        pass  # read-only deployment or no Parquet engine; the CSV is still the source of truth
+    return df
+
+
+def load_ratings(path=MAIN_DATA_PATH, use_snapshot=True, snapshot_dir=SNAPSHOT_DIR):
+    """Return the typed, enriched ratings frame, re-reading it only when the file has changed.
+
+    The frame is cached per path and keyed by (mtime, size); when those change the file is
+    re-hashed and only reloaded if its content differs. ``df.attrs['dataset_version']`` holds
+    the content hash so downstream caches can key on it.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    with _memo_lock:
+        cached = _memo.get(path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[2]
+
+        digest = file_digest(path)
+        if cached is not None and cached[1] == digest:
+            # Touched but not modified
+            _memo[path] = (stat_key, digest, cached[2])
+            return cached[2]
+
+        with span('parse'):
+            df = _load_uncached(path, digest, use_snapshot, snapshot_dir)
+        with span('enrich'):
+            df = enrich(df)
+        df.attrs['dataset_version'] = digest
+        _memo[path] = (stat_key, digest, df)
+        return df
+
+
+def dataset_version(df):
+    return df.attrs.get('dataset_version')
+
+
+def clear_cache():
+    with _memo_lock:
+        _memo.clear()
+
+
+# ---- Load report ----
+def _measure(label, load):
+    # Timed and traced separately: tracemalloc itself slows the parse down considerably
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    df = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frame_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms {frame_mb:>10.2f} MB {peak / 1e6:>10.2f} MB")
+    return df
+
+
+def report(path=MAIN_DATA_PATH):
+    digest = file_digest(path)
+    snap = snapshot_path(path, digest)
+    print(f"{'':<28} {'load time':>12} {'frame size':>13} {'peak alloc':>13}")
+    _measure("untyped pd.read_csv", lambda: pd.read_csv(path))
+    df = _measure("typed CSV parse", lambda: read_ratings_csv(path))
+    write_snapshot(df, snap)
+    _measure("Parquet snapshot", lambda: read_snapshot(snap))
+    clear_cache()
+    load_ratings(path)
+    _measure("memoized load_ratings", lambda: load_ratings(path))
+
+
+if __name__ == "__main__":
+    report()
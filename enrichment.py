@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# Season the ratings belong to; ages are reported as of this year
+RATINGS_YEAR = 2024
+
+# ---- Region lookup ----
+REGIONS = ['North Africa', 'Rest of Africa', 'Rest of World']
+DEFAULT_REGION = 'Rest of World'
+
+nation_region = {
+    **{nation: 'North Africa' for nation in
+       ['Egypt', 'Morocco', 'Algeria', 'Tunisia', 'Libya', 'Mauritania', 'Sudan']},
+    **{nation: 'Rest of Africa' for nation in ['Nigeria', 'Senegal', 'Ghana', 'Cameroon']},
+}
+
+# ---- League lookup ----
+LEAGUES = ['England', 'France', 'Germany', 'Rest of the World', 'Spain', 'USA']
+DEFAULT_LEAGUE = 'Rest of the World'
+
+league_teams = {
+    "Men's Football": {
+        'England': ['Arsenal', 'Aston Villa', 'Manchester City', 'Manchester Utd', 'Chelsea', 'Liverpool',
+                    'AFC Bournemouth', 'Spurs', 'Newcastle Utd', 'West Ham', 'Everton', 'Crystal Palace',
+                    'Brighton', 'Wolves', 'Fulham', "Nott'm Forest", 'Brentford', 'Leicester City', 'Southampton',
+                    'Ipswich'],
+        'Spain': ['FC Barcelona', 'Real Madrid', 'Atlético de Madrid', 'Athletic Club', 'Girona FC', 'Villarreal CF',
+                  'Real Sociedad', 'Real Betis', 'Sevilla FC', 'RCD Mallorca', 'Valencia CF', 'Rayo Vallecano',
+                  'RC Celta', 'CA Osasuna', 'UD Las Palmas', 'D. Alavés', 'Getafe CF', 'CD Leganes', 'RCD Espanyol',
+                  'R. Valladolid CF'],
+        'Germany': ['FC Bayern München', 'Leverkusen', 'Borussia Dortmund', 'RB Leipzig', 'Frankfurt',
+                    'TSG Hoffenhein', 'SC Freiburg', "M'gladbach", 'VfL Wolfsburg', 'VfB Stuttgart', 'Union Berlin',
+                    'SV Werder Bremen', 'FC Augsburg', '1. FSV Mainz 05', 'VfL Bochum 1848', 'Heidenheim',
+                    'FC St. Pauli', 'Holstein Kiel'],
+        'France': ['Paris SG', 'OM', 'OL', 'AS Monaco', 'LOSC Lille', 'OGC Nice', 'RC Lens', 'Stade Brestois 29',
+                   'Stade Rennais FC', 'Montpellier', 'Stade de Reims', 'Toulouse FC', 'FC Nantes', 'Strasbourg',
+                   'Havre AC', 'AJ Auxerre', 'AS Saint-Étienne', 'Angers SCO'],
+        'USA': ['Inter Miami CF', 'LAFC', 'LA Galaxy', 'FC Cincinnati', 'Columbus Crew', 'Philadelphia',
+                'Sounders FC', 'Charlotte FC', 'Whitecaps FC', 'Houston Dynamo', 'St. Louis CITY SC', 'New England',
+                'Atlanta United', 'Orlando City', 'SJ Earthquakes', 'Portland Timbers', 'Real Salt Lake', 'FC Dallas',
+                'Nashville SC', 'Austin FC', 'D.C. United', 'Sporting KC', 'Red Bulls', 'Toronto FC',
+                'Minnesota United', 'New York City FC', 'Chicago Fire FC', 'CF Montréal', 'Colorado Rapids'],
+    },
+    "Women's Football": {
+        'England': ['Arsenal', 'Aston Villa', 'Brighton', 'Chelsea', 'Crystal Palace', 'Everton', 'Leicester City',
+                    'Liverpool', 'Manchester City', 'Manchester Utd', 'Spurs', 'West Ham'],
+        'Spain': ['FC Barcelona', 'Real Madrid CF', 'Atlético de Madrid', 'Athletic Club', 'Granada CF',
+                  'Levante Badalona', 'Levante UD', 'Madrid CFF', 'RC Deportivo', 'RCD Espanyol', 'Real Betis',
+                  'Real Sociedad', 'SD Eibar', 'Sevilla FC', 'UD Tenerife', 'Valencia CF'],
+        'Germany': ['1. FC Köln', 'Carl Zeiss Jena', 'FC Bayern München', 'Frankfurt', 'Leverkusen', 'RB Leipzig',
+                    'SC Freiburg', 'SGS Essen', 'SV Werder Bremen', 'TSG Hoffenheim', 'Turbine Potsdam',
+                    'VfL Wolfsburg'],
+        'France': ['OL', 'Paris SG', 'AS Saint Étienne', 'Dijon FCO', 'En Avant Guingamp', 'FC Fleury 91',
+                   'FC Nantes', 'Havre AC', 'Montpellier', 'Paris FC', 'Stade de Reims', 'Strasbourg'],
+        'USA': ['Angel City FC', 'Bay FC', 'Chicago Red Stars', 'KC Current', 'Houston Dash', 'NC Courage',
+                'NJ/NY Gotham', 'Orlando Pride', 'Portland Thorns', 'Rac. Louisville', 'San Diego Wave',
+                'Seattle Reign', 'Utah Royals FC', 'Washington Spirit'],
+    },
+}
+
+team_league = {
+    (gender, team): league
+    for gender, leagues in league_teams.items()
+    for league, teams in leagues.items()
+    for team in teams
+}
+
+
+# ---- Code maps ----
+# Lookups are resolved once per category (155 nations, ~700 teams) and then applied to every
+# row with a single integer take on the categorical codes. Each table ends with a slot holding
+# the default, which missing values (code -1) pick up.
+def _lookup_codes(categories, mapping, labels, default):
+    return np.array([labels.index(mapping.get(value, default)) for value in categories] + [labels.index(default)],
+                    dtype=np.int8)
+
+
+def _from_codes(codes, labels):
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def region_column(nation):
+    table = _lookup_codes(nation.cat.categories, nation_region, REGIONS, DEFAULT_REGION)
+    return _from_codes(table[nation.cat.codes.to_numpy()], REGIONS)
+
+
+def league_column(gender, team):
+    # (gender x team) table of league codes, plus a default row and column for missing values
+    default = LEAGUES.index(DEFAULT_LEAGUE)
+    table = np.full((len(gender.cat.categories) + 1, len(team.cat.categories) + 1), default, dtype=np.int8)
+    for i, g in enumerate(gender.cat.categories):
+        table[i, :-1] = [LEAGUES.index(team_league.get((g, t), DEFAULT_LEAGUE)) for t in team.cat.categories]
+    codes = table[gender.cat.codes.to_numpy(), team.cat.codes.to_numpy()]
+    return _from_codes(codes, LEAGUES)
+
+
+def age_column(birthdate):
+    return (RATINGS_YEAR - birthdate.dt.year).astype('UInt8')
+
+
+def enrich(df):
+    """Return a copy of ``df`` with the derived region, League_Nation and Age columns added."""
+    return df.assign(
+        region=region_column(df['Nation']),
+        League_Nation=league_column(df['Gender'], df['Team']),
+        Age=age_column(df['Birthdate']),
+    )
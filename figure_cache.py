@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+
+import plotly.graph_objects as go
+
+from caching import LRUCache
+from figures import page_figures, warm_selections
+from instrumentation import span
+
+FIGURE_CACHE_MB = float(os.environ.get('DASHBOARD_FIGURE_CACHE_MB', 64))
+
+
+# ---- Bounded LRU of serialized figures ----
+class FigureCache(LRUCache):
+    """LRU cache of figure JSON, bounded by the total size of the stored payloads."""
+
+    def __init__(self, max_bytes):
+        super().__init__(max_bytes, size=len)
+
+
+figure_cache = FigureCache(int(FIGURE_CACHE_MB * 1024 * 1024))
+
+
+# ---- Page figures ----
+def normalize_selection(selection):
+    """Hashable, order-insensitive where order doesn't change the figure (the league set)."""
+    items = []
+    for name, value in sorted(selection.items()):
+        if name == 'leagues' and value is not None:
+            value = tuple(sorted(value))
+        elif isinstance(value, (list, tuple)):
+            value = tuple(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+def figure_json(backend, page, **selection):
+    key = (page, normalize_selection(selection), backend.version)
+    with span('figure_cache'):
+        return figure_cache.get_or_build(key, lambda: _build_json(backend, page, selection))
+
+
+def _build_json(backend, page, selection):
+    # Inclusive of the aggregate/filter/regression spans recorded inside the builder
+    with span('build_figure'):
+        fig = page_figures[page](backend, **selection)
+    with span('to_json'):
+        return fig.to_json()
+
+
+def figure_from_json(payload):
+    # The payload was produced by plotly itself, so skip re-validating every attribute
+    return go.Figure(json.loads(payload), _validate=False)
+
+
+def page_figure(backend, page, **selection):
+    """Figure for ``page`` with the given widget selection, built at most once per dataset version."""
+    payload = figure_json(backend, page, **selection)
+    with span('from_json'):
+        return figure_from_json(payload)
+
+
+_warmed_versions = set()
+_warm_lock = threading.Lock()
+
+
+def _warm(backend):
+    for page, selection in warm_selections:
+        figure_json(backend, page, **selection)
+
+
+def warm_figure_cache(backend, background=False):
+    """Build every page's default views once per dataset version, optionally on a daemon thread."""
+    version = backend.version
+    with _warm_lock:
+        if version in _warmed_versions:
+            return
+        _warmed_versions.add(version)
+    if background:
+        threading.Thread(target=_warm, args=(backend,), name='figure-cache-warm', daemon=True).start()
+    else:
+        _warm(backend)
@@ -0,0 +1,386 @@
+import itertools
+import os
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from instrumentation import set_memory, span
+from regression import PairStats, TrendTable
+
+gender_colors = {"Men's Football": "#3200ff", "Women's Football": "#fa00ff"}
+
+# ---- Africa ----
+region_colors = {
+    'North Africa': '#0705e7',
+    'Rest of Africa': '#ff6600',
+    'Rest of World': '#4CBB17'
+}
+
+
+def _error_bars(mean, lo, hi, width):
+    return dict(type='data', array=hi - mean, arrayminus=mean - lo, color='black', thickness=1, width=width)
+
+
+def africa_figure(backend, features, error_bars=False, player_filter=None):
+    selected_features = list(features)
+    # Slice of the precomputed per-region aggregates (no scan over players) unless players are filtered
+    with span('aggregate'):
+        region_means = backend.group_means('region', selected_features, player_filter)
+    if error_bars:
+        with span('bootstrap'):
+            ci_lo, ci_hi = backend.group_mean_ci('region', selected_features, player_filter)
+
+    fig = go.Figure()
+    for region, values in zip(region_means.index, region_means.to_numpy()):
+        extra = {}
+        if error_bars:
+            extra['error_y'] = _error_bars(values, ci_lo.loc[region].to_numpy(), ci_hi.loc[region].to_numpy(), 3)
+        fig.add_trace(go.Bar(
+            x=selected_features,
+            y=values,
+            name=region,
+            text=np.round(values, 1),
+            textposition='outside',
+            textfont=dict(color='black'),
+            marker_color=region_colors.get(region, '#7f7f7f'),
+            hovertemplate=(
+                    '<span style="color:black !important;"><b>Continent Category:</b></span> ' + region + '<br>' +
+                    '<span style="color:black !important;"><b>Feature:</b></span> %{x}<br>' +
+                    '<span style="color:black !important;"><b>Average Rating:</b></span> %{y}<extra></extra>'
+            ),
+            **extra
+        ))
+
+    fig.update_layout(
+        barmode='group',
+        yaxis_title=dict(
+            text="<b>Average Rating</b>",
+            font=dict(size=16, color="black")
+        ),
+        xaxis_title=dict(
+            text="<b>Feature</b>",
+            font=dict(size=16, color="black")
+        ),
+        font=dict(size=14),
+        yaxis=dict(range=[0, 100], showgrid=False, showticklabels=False),
+        xaxis=dict(showgrid=False, tickangle=-45, tickfont=dict(size=14, color='black')),
+        legend=dict(
+            title=dict(
+                text="<b>Continent Category:</b>",
+                font=dict(size=12, color="black")
+            ),
+            orientation="h",
+            title_side="left",
+            yanchor="bottom",
+            y=1.00,
+            xanchor="center",
+            x=0.5
+        ),
+        title=dict(text="Average Feature by Region", y=1.00, x=0, xanchor='left', yanchor='top')
+    )
+    return fig
+
+
+# ---- Scatter render modes ----
+# 'auto'       full detail; SVG markers up to WEBGL_THRESHOLD points, WebGL above that
+# 'svg'        full detail, always SVG
+# 'webgl'      full detail, always WebGL
+# 'aggregated' one WebGL marker per (gender, x, y) cell sized by player count, no per-player hover
+RENDER_MODES = ['auto', 'svg', 'webgl', 'aggregated']
+WEBGL_THRESHOLD = int(os.environ.get('DASHBOARD_WEBGL_THRESHOLD', 1000))
+
+
+def _label(text):
+    return f'<span style="color:black !important;"><b>{text}:</b></span>'
+
+
+def _point_traces(points, x_axis, y_axis, use_webgl):
+    trace_type = go.Scattergl if use_webgl else go.Scatter
+    hovertemplate = (
+        f'{_label(x_axis)} %{{x}}<br>' +
+        f'{_label(y_axis)} %{{y}}<br>' +
+        f'{_label("Gender")} %{{meta}}<br>' +
+        f'{_label("Name")} %{{customdata[0]}}<br>' +
+        f'{_label("Team")} %{{customdata[1]}}<br>' +
+        '<extra></extra>'
+    )
+    traces = []
+    for gender in points.genders:
+        traces.append(trace_type(
+            x=points.column(gender, x_axis),
+            y=points.column(gender, y_axis),
+            mode='markers',
+            name=gender,
+            legendgroup=gender,
+            meta=gender,
+            marker=dict(color=gender_colors.get(gender, '#7f7f7f')),
+            # The dataset row identifies a clicked player (names are not unique, even within a team)
+            customdata=np.column_stack([points.column(gender, 'Name'), points.column(gender, 'Team'),
+                                        points.row_ids(gender)]),
+            hovertemplate=hovertemplate
+        ))
+    return traces
+
+
+def aggregate_cells(points, x_axis, y_axis, gender):
+    # Ratings are integers 0-99, so every (x, y) pair is one of 100 x 100 cells
+    cells = points.column(gender, x_axis).astype(np.intp) * 100 + points.column(gender, y_axis)
+    counts = np.bincount(cells, minlength=100 * 100)
+    occupied = np.flatnonzero(counts)
+    return occupied // 100, occupied % 100, counts[occupied]
+
+
+def _aggregated_traces(points, x_axis, y_axis):
+    hovertemplate = (
+        f'{_label(x_axis)} %{{x}}<br>' +
+        f'{_label(y_axis)} %{{y}}<br>' +
+        f'{_label("Gender")} %{{meta}}<br>' +
+        f'{_label("Players")} %{{marker.size}}<extra></extra>'
+    )
+    traces = []
+    for gender in points.genders:
+        x, y, counts = aggregate_cells(points, x_axis, y_axis, gender)
+        traces.append(go.Scattergl(
+            x=x,
+            y=y,
+            mode='markers',
+            name=gender,
+            legendgroup=gender,
+            meta=gender,
+            marker=dict(
+                color=gender_colors.get(gender, '#7f7f7f'),
+                size=counts,
+                sizemode='area',
+                sizeref=max(counts.max(), 1) / 20 ** 2 if len(counts) else 1,
+                sizemin=3,
+                opacity=0.7
+            ),
+            hovertemplate=hovertemplate
+        ))
+    return traces
+
+
+def resolve_render_mode(render_mode, n_points):
+    if render_mode == 'auto':
+        return 'webgl' if n_points > WEBGL_THRESHOLD else 'svg'
+    return render_mode
+
+
+def scatter_figure(points, x_axis, y_axis, render_mode='auto', trendlines=None):
+    # points: query_backend.PointSet; trendlines: {gender: (x, y)}, fitted on the points when omitted
+    mode = resolve_render_mode(render_mode, len(points))
+
+    fig = go.Figure()
+    if mode == 'aggregated':
+        fig.add_traces(_aggregated_traces(points, x_axis, y_axis))
+    else:
+        fig.add_traces(_point_traces(points, x_axis, y_axis, use_webgl=mode == 'webgl'))
+
+    for gender in points.genders:
+        if trendlines is not None:
+            x_range, y_pred = trendlines[gender]
+        else:
+            values = np.column_stack([points.column(gender, x_axis), points.column(gender, y_axis)])
+            stats = PairStats.from_values([x_axis, y_axis], values)
+            x_range, y_pred = TrendTable(stats).line(x_axis, y_axis)
+
+        line_color = gender_colors.get(gender, '#7f7f7f')
+
+        fig.add_trace(go.Scatter(
+            x=x_range,
+            y=y_pred,
+            mode='lines',
+            name=f"{gender} Trendline",
+            line=dict(width=2, color=line_color),
+            hovertemplate=(
+                    f'{_label(x_axis)} %{{x}}<br>' +
+                    f'{_label(y_axis)} %{{y}}<br>' +
+                    f'{_label("Gender")} {gender}<extra></extra>'
+            )
+        ))
+
+    fig.update_layout(
+        xaxis_title=dict(
+            text=f"<b>{x_axis}</b>",
+            font=dict(size=16, color="black")
+        ),
+        yaxis_title=dict(
+            text=f"<b>{y_axis}</b>",
+            font=dict(size=16, color="black")
+        ),
+        font=dict(size=14),
+        yaxis=dict(range=[0, 100], showgrid=False),
+        xaxis=dict(showgrid=False),
+        legend=dict(
+            title=dict(
+                text="<b>Gender:</b>",
+                font=dict(size=12, color="black")
+            ),
+            orientation="h",
+            title_side="left",
+            yanchor="bottom",
+            y=1.00,
+            xanchor="center",
+            x=0.5,
+            font=dict(size=11.5)
+        ),
+        title=dict(text=f"{x_axis} vs {y_axis} by Gender", y=1.00, x=0, xanchor='left', yanchor='top')
+    )
+    return fig
+
+
+def gender_scatter_figure(backend, gender_filter, leagues, x_axis, y_axis, render_mode='auto', player_filter=None):
+    # leagues: None for all leagues. Only the columns the chosen render mode draws are fetched.
+    columns = ['Gender', x_axis, y_axis]
+    if render_mode != 'aggregated':
+        columns += ['Name', 'Team']
+    with span('filter'):
+        points = backend.points(columns, gender_filter, leagues, player_filter)
+    set_memory('selection_index', points.nbytes)
+
+    # Trendlines come from the cached closed-form fits for the selected leagues
+    with span('regression'):
+        trendlines = backend.trend_lines(gender_filter, leagues, x_axis, y_axis, player_filter)
+    return scatter_figure(points, x_axis, y_axis, render_mode, trendlines)
+
+
+# ---- Ages ----
+custom_palette = [
+    "#0705e7",  # blue
+    "#ff6600",  # valencia orange
+    "#4CBB17",  # green
+    "#ff5850",  # red
+    "#9467bd",  # purple
+    "#8c564b",  # brown
+    "#e377c2",  # pink
+    "#7f7f7f",  # gray
+    "#bcbd22",  # lime
+    "#17becf",  # cyan
+    "#393b79",  # dark blue
+    "#637939",  # olive green
+    "#8c6d31",  # ochre
+    "#843c39",  # brick red
+    "#7b4173",  # plum
+    "#17a398",  # teal
+    "#ff6347",  # tomato red
+    "#00ced1",  # dark turquoise
+    "#6a5acd",  # slate blue
+    "#32cd32",  # lime green
+    "#ff69b4",  # hot pink
+    "#ffa500",  # pure orange
+    "#4682b4",  # steel blue
+    "#9acd32",  # yellow green
+    "#dc143c",  # crimson
+    "#00fa9a",  # medium spring green
+    "#ff1493",  # deep pink
+    "#a52a2a",  # brown
+    "#5f9ea0",  # cadet blue
+    "#9932cc",  # dark orchid
+]
+
+
+def ages_figure(backend, age_range, features, error_bars=False, player_filter=None):
+    import plotly.express as px  # only this page uses it, and it is the slowest plotly import
+
+    selected_features = list(features)
+    # Per-age means straight from the precomputed age index; no scan over players
+    with span('aggregate'):
+        age_means = backend.age_means(age_range[0], age_range[1], selected_features, player_filter).reset_index()
+
+    color_discrete_map = dict(zip(selected_features, itertools.cycle(custom_palette)))
+
+    fig = px.line(age_means, x='Age', y=selected_features, color_discrete_map=color_discrete_map)
+    for i, feature in enumerate(selected_features):
+        fig.data[i].hovertemplate = (
+                '<span style="color:black !important;"><b>Feature:</b></span> ' + feature + '<br>' +
+                '<span style="color:black !important;"><b>Age:</b></span> %{x}<br>' +
+                '<span style="color:black !important;"><b>Average Rating:</b></span> %{y}<extra></extra>'
+        )
+    if error_bars:
+        with span('bootstrap'):
+            ci_lo, ci_hi = backend.age_mean_ci(age_range[0], age_range[1], selected_features, player_filter)
+        for i, feature in enumerate(selected_features):
+            mean = age_means[feature].to_numpy()
+            fig.data[i].error_y = _error_bars(mean, ci_lo[feature].to_numpy(), ci_hi[feature].to_numpy(), 2)
+
+    fig.update_layout(
+        xaxis_title=dict(
+            text="<b>Age</b>",
+            font=dict(size=16, color="black")
+        ),
+        yaxis_title=dict(
+            text="<b>Average Rating</b>",
+            font=dict(size=16, color="black")
+        ),
+        font=dict(
+            size=16,
+            color="black"
+        ),
+        yaxis=dict(range=[0, 100], showgrid=False),
+        xaxis=dict(showgrid=False),
+        legend=dict(
+            title=dict(
+                text="<b>Feature:</b>",
+                font=dict(size=12, color="black")
+            ),
+            orientation="h",
+            title_side="left",
+            yanchor="bottom",
+            y=1.00,
+            xanchor="center",
+            x=0.5
+        ),
+        title=dict(text="Changes in Abilities Over Age", y=1.00, x=0, xanchor='left', yanchor='top')
+    )
+    return fig
+
+
+# ---- Page registry ----
+page_figures = {
+    'Africa': africa_figure,
+    'Men vs Women': gender_scatter_figure,
+    'Ages': ages_figure,
+}
+
+# What each page shows on first load
+default_selections = {
+    'Africa': dict(features=['Pace', 'Stamina', 'Strength', 'Aggression'], error_bars=False, player_filter=None),
+    'Men vs Women': dict(gender_filter='All', leagues=['Germany'], x_axis='Aggression', y_axis='Composure',
+                         render_mode='auto', player_filter=None),
+    'Ages': dict(age_range=(17, 43), features=['Pace', 'Stamina', 'Reactions', 'Strength'], error_bars=False,
+                 player_filter=None),
+}
+
+# Also built in the background at start-up, so that switching error bars on hits the cache
+warm_selections = list(default_selections.items()) + [
+    (page, dict(default_selections[page], error_bars=True)) for page in ('Africa', 'Ages')
+]
+
+
+# ---- Payload report ----
+def measure_figure(build):
+    """Return (build seconds, serialize seconds, payload bytes) for one figure."""
+    start = time.perf_counter()
+    fig = build()
+    built = time.perf_counter()
+    payload = fig.to_json()
+    serialized = time.perf_counter()
+    return built - start, serialized - built, len(payload.encode('utf-8'))
+
+
+def report():
+    from data_loader import load_ratings
+
+    from query_backend import PandasBackend
+
+    points = PandasBackend(load_ratings()).points(['Gender', 'Aggression', 'Composure', 'Name', 'Team'], 'All', None)
+    scatter_figure(points, 'Aggression', 'Composure')  # warm-up: imports and first-call overhead
+    print(f"{'render mode':<12} {'points':>8} {'build':>10} {'serialize':>11} {'payload':>12}")
+    for mode in RENDER_MODES:
+        build_s, serialize_s, size = measure_figure(lambda: scatter_figure(points, 'Aggression', 'Composure', mode))
+        print(f"{mode:<12} {len(points):>8} {build_s * 1000:>7.1f} ms {serialize_s * 1000:>8.1f} ms {size / 1024:>9.1f} KB")
+
+
+if __name__ == "__main__":
+    report()
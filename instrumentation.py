@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Opt-in: DASHBOARD_METRICS=1 turns on timing spans, the sidebar debug panel and the
+# Prometheus export. When off, span() hands back a shared no-op object.
+ENABLED = os.environ.get('DASHBOARD_METRICS', '') not in ('', '0')
+METRICS_FILE = os.environ.get('DASHBOARD_METRICS_FILE', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.cache', 'metrics.prom'))
+EXPORT_INTERVAL_S = 5.0
+SAMPLE_WINDOW = 1000  # most recent samples per (page, stage) used for quantiles
+QUANTILES = (0.5, 0.95)
+
+
+# ---- Spans ----
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        spans = getattr(_local, 'spans', None)
+        if spans is not None:
+            spans.append((self.stage, time.perf_counter() - self.start))
+        return False
+
+
+def span(stage):
+    """Time a block as ``stage`` of the current rerun (no-op when disabled or outside a rerun)."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(stage)
+
+
+@contextmanager
+def rerun(page):
+    """Collect the spans of one page rerun; yields the list of (stage, seconds) being filled."""
+    if not ENABLED:
+        yield None
+        return
+    spans = []
+    _local.spans = spans
+    start = time.perf_counter()
+    try:
+        yield spans
+    finally:
+        spans.append(('rerun', time.perf_counter() - start))
+        _local.spans = None
+        _record(page, spans)
+
+
+# ---- Aggregation and export ----
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+_totals = defaultdict(lambda: [0, 0.0])
+_memory = {}
+_lock = threading.Lock()
+_last_export = [0.0]
+
+
+def _record(page, spans):
+    # A stage can run several times in one rerun (e.g. nested figure builds); sum them up
+    per_stage = defaultdict(float)
+    for stage, seconds in spans:
+        per_stage[stage] += seconds
+    with _lock:
+        for stage, seconds in per_stage.items():
+            _samples[(page, stage)].append(seconds)
+            total = _totals[(page, stage)]
+            total[0] += 1
+            total[1] += seconds
+        due = time.monotonic() - _last_export[0] >= EXPORT_INTERVAL_S
+        if due:
+            _last_export[0] = time.monotonic()
+    if due:
+        export()
+
+
+def set_memory(kind, nbytes):
+    """Record the current size of a memory pool (shared dataset, figure cache, per-session state...)."""
+    if not ENABLED or nbytes is None:
+        return
+    with _lock:
+        _memory[kind] = nbytes
+
+
+def memory():
+    with _lock:
+        return dict(_memory)
+
+
+def _quantile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _label_value(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def prometheus_text():
+    lines = [
+        '# HELP dashboard_stage_seconds Time spent in each dashboard stage per page rerun.',
+        '# TYPE dashboard_stage_seconds summary',
+    ]
+    with _lock:
+        snapshot = {key: (sorted(_samples[key]), list(total)) for key, total in _totals.items()}
+    for (page, stage), (values, (count, total)) in sorted(snapshot.items()):
+        labels = f'page="{_label_value(page)}",stage="{_label_value(stage)}"'
+        for q in QUANTILES:
+            lines.append(f'dashboard_stage_seconds{{{labels},quantile="{q}"}} {_quantile(values, q):.6f}')
+        lines.append(f'dashboard_stage_seconds_sum{{{labels}}} {total:.6f}')
+        lines.append(f'dashboard_stage_seconds_count{{{labels}}} {count}')
+    lines += [
+        '# HELP dashboard_memory_bytes Bytes held by each memory pool as of the last rerun that measured it.',
+        '# TYPE dashboard_memory_bytes gauge',
+    ]
+    for kind, nbytes in sorted(memory().items()):
+        lines.append(f'dashboard_memory_bytes{{kind="{_label_value(kind)}"}} {nbytes}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path=None):
+    """Write the summaries in Prometheus text format (atomically, for textfile collectors)."""
+    path = path or METRICS_FILE
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # metrics must never break the page
+
+
+def summary():
+    """{(page, stage): dict(count, p50, p95)} over the recent samples."""
+    with _lock:
+        snapshot = {key: (sorted(values), _totals[key][0]) for key, values in _samples.items()}
+    return {key: dict(count=count, p50=_quantile(values, 0.5), p95=_quantile(values, 0.95))
+            for key, (values, count) in snapshot.items() if values}
@@ -0,0 +1,52 @@
+"""Files and manifests shared by the offline builds (artifacts.py, prerender.py).
+
+Both write their outputs atomically and record each file's sha1 in a manifest.json next to
+them, along with a hash of the source files whose changes make the outputs stale.
+"""
+import hashlib
+import json
+import os
+
+from data_loader import BASE_DIR, file_digest
+
+MANIFEST = 'manifest.json'
+
+_source_hashes = {}
+
+
+def write_atomic(path, save):
+    """Write ``path`` through ``save(f)`` on a temp file moved into place; returns the file's sha1."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        save(f)
+    os.replace(tmp_path, path)
+    return file_digest(path)
+
+
+def file_matches(path, sha1):
+    return os.path.exists(path) and file_digest(path) == sha1
+
+
+def read_manifest(out_dir):
+    """The manifest in ``out_dir``, or None when it is missing or unreadable."""
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(out_dir, manifest):
+    write_atomic(os.path.join(out_dir, MANIFEST), lambda f: f.write(json.dumps(manifest, indent=1).encode()))
+
+
+def source_hash(names):
+    """sha1 over the contents of the repository files ``names``, in order; computed once per process."""
+    names = tuple(names)
+    if names not in _source_hashes:
+        h = hashlib.sha1()
+        for name in names:
+            with open(os.path.join(BASE_DIR, name), 'rb') as f:
+                h.update(f.read())
+        _source_hashes[names] = h.hexdigest()
+    return _source_hashes[names]
@@ -0,0 +1,202 @@
+"""Bitset encoding of the Player Abilities and Alternate Positions columns.
+
+The CSV lists a player's PlayStyles as free text ("Finesse Shot, Rapid, Flair, Trivela+")
+and likewise their other positions ("LW, CAM"). At parse time each list becomes one integer
+whose bits index a fixed vocabulary:
+
+    Player Abilities     uint64, bit i set when the player has PLAYSTYLES[i] at either tier
+    PlayStyles+          uint64, bit i set when that PlayStyle is a PlayStyle+
+    Alternate Positions  uint16, bit i set when the player can also play POSITIONS[i]
+
+The vocabularies are fixed rather than read from the data, so a bit means the same thing in
+every file, Parquet snapshot and incremental refresh. Tokens outside them are dropped.
+A filter such as "Rapid and Power Shot" or "can play LW" is then one bitwise AND over a
+whole column, in pandas and in a pyarrow dataset scan alike.
+"""
+import sys
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+PLAYSTYLES = [
+    'Finesse Shot', 'Chip Shot', 'Power Shot', 'Dead Ball', 'Power Header', 'Low Driven Shot', 'Gamechanger',
+    'Incisive Pass', 'Pinged Pass', 'Long Ball Pass', 'Tiki Taka', 'Whipped Pass', 'Jockey', 'Block',
+    'Intercept', 'Anticipate', 'Slide Tackle', 'Technical', 'Rapid', 'Flair', 'First Touch', 'Trickster',
+    'Press Proven', 'Quick Step', 'Relentless', 'Trivela', 'Acrobatic', 'Long Throw', 'Aerial', 'Bruiser',
+    'Enforcer', 'Far Throw', 'Footwork', 'Cross Claimer', 'Rush Out', 'Far Reach', 'Deflector', '1v1 Close Down',
+]
+POSITIONS = ['GK', 'CB', 'LB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM', 'LM', 'RM', 'LW', 'RW', 'CF', 'ST']
+PLUS = '+'
+
+# column -> (vocabulary, dtype); 'Player Abilities' also fills PLUS_COLUMN
+tag_columns = {
+    'Player Abilities': (PLAYSTYLES, np.uint64),
+    'Alternate Positions': (POSITIONS, np.uint16),
+}
+PLUS_COLUMN = 'PlayStyles+'
+SEPARATOR = ', '
+# Every column a PlayerFilter reads
+FILTER_COLUMNS = ['Player Abilities', PLUS_COLUMN, 'Position', 'Alternate Positions']
+
+
+def bits(names, vocabulary):
+    """Mask with the bit of every name in ``names`` set."""
+    mask = 0
+    for name in names:
+        mask |= 1 << vocabulary.index(name)
+    return mask
+
+
+def names(mask, vocabulary):
+    return [name for i, name in enumerate(vocabulary) if int(mask) >> i & 1]
+
+
+# ---- Encoding ----
+def _parse(text, vocabulary):
+    mask = plus = 0
+    for token in text.split(','):
+        token = token.strip()
+        is_plus = token.endswith(PLUS)
+        token = token.rstrip(PLUS)
+        if token in vocabulary:
+            bit = 1 << vocabulary.index(token)
+            mask |= bit
+            if is_plus:
+                plus |= bit
+    return mask, plus
+
+
+def encode(column, vocabulary, dtype):
+    """(mask, plus mask) arrays for a text column; each distinct string is parsed once."""
+    codes, uniques = pd.factorize(column)
+    # One row per distinct string, then an all-zero row that missing values (code -1) pick up
+    table = np.array([_parse(text, vocabulary) for text in uniques] + [(0, 0)], dtype=dtype)
+    return table[codes, 0], table[codes, 1]
+
+
+def encode_tags(df):
+    """Replace the tag text columns of a freshly parsed frame with their bitsets."""
+    columns = {}
+    for col, (vocabulary, dtype) in tag_columns.items():
+        mask, plus = encode(df[col], vocabulary, dtype)
+        columns[col] = mask
+        if col == 'Player Abilities':
+            columns[PLUS_COLUMN] = plus
+    return df.assign(**columns)
+
+
+def _text(mask, plus, vocabulary):
+    return SEPARATOR.join(name + (PLUS if int(plus) >> i & 1 else '')
+                          for i, name in enumerate(vocabulary) if int(mask) >> i & 1) or None
+
+
+def decode_tags(df):
+    """The inverse of encode_tags, for writing a frame back out as CSV."""
+    columns = {}
+    for col, (vocabulary, _) in tag_columns.items():
+        plus = df[PLUS_COLUMN] if col == 'Player Abilities' else pd.Series(0, index=df.index)
+        pairs, codes = np.unique(np.column_stack([df[col].to_numpy(), plus.to_numpy()]).astype(np.uint64), axis=0,
+                                 return_inverse=True)
+        text = np.array([_text(mask, plus_mask, vocabulary) for mask, plus_mask in pairs], dtype=object)
+        columns[col] = pd.array(text[codes.ravel()], dtype='string')
+    return df.assign(**columns).drop(columns=PLUS_COLUMN)
+
+
+# ---- Filters ----
+class PlayerFilter(NamedTuple):
+    """Players with all of ``playstyles`` (either tier), all of ``playstyles_plus`` as PlayStyle+,
+    and any of ``positions`` as their main or an alternate position. Hashable, for cache keys."""
+    playstyles: tuple = ()
+    playstyles_plus: tuple = ()
+    positions: tuple = ()
+
+    @classmethod
+    def of(cls, playstyles=(), playstyles_plus=(), positions=()):
+        """A filter from widget values, or None when nothing is selected."""
+        if not (playstyles or playstyles_plus or positions):
+            return None
+        return cls(tuple(sorted(playstyles)), tuple(sorted(playstyles_plus)), tuple(sorted(positions)))
+
+    def mask(self, df):
+        """Boolean mask of the players in ``df`` who pass the filter."""
+        keep = np.ones(len(df), dtype=bool)
+        for col, wanted in (('Player Abilities', self.playstyles), (PLUS_COLUMN, self.playstyles_plus)):
+            if wanted:
+                want = np.uint64(bits(wanted, PLAYSTYLES))
+                keep &= (df[col].to_numpy() & want) == want
+        if self.positions:
+            # Main position through a lookup over its categories, alternates through the bitset
+            position = df['Position'].cat
+            main = position.categories.isin(self.positions)[position.codes.to_numpy()]
+            want = np.uint16(bits(self.positions, POSITIONS))
+            keep &= main | ((df['Alternate Positions'].to_numpy() & want) != 0)
+        return keep
+
+    def expression(self):
+        """The same filter as a pyarrow dataset expression."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        expr = None
+        for col, wanted in (('Player Abilities', self.playstyles), (PLUS_COLUMN, self.playstyles_plus)):
+            if wanted:
+                want = pa.scalar(bits(wanted, PLAYSTYLES), pa.uint64())
+                cond = pc.bit_wise_and(pc.field(col), want) == want
+                expr = cond if expr is None else expr & cond
+        if self.positions:
+            want = pa.scalar(bits(self.positions, POSITIONS), pa.uint16())
+            cond = pc.field('Position').isin(list(self.positions)) | (
+                pc.bit_wise_and(pc.field('Alternate Positions'), want) != pa.scalar(0, pa.uint16()))
+            expr = cond if expr is None else expr & cond
+        return expr
+
+    def describe(self):
+        parts = [f"has {', '.join(self.playstyles)}" if self.playstyles else '',
+                 f"has {', '.join(name + PLUS for name in self.playstyles_plus)}" if self.playstyles_plus else '',
+                 f"can play {' or '.join(self.positions)}" if self.positions else '']
+        return '; '.join(part for part in parts if part)
+
+
+# ---- Memory report ----
+def report(path=None):
+    """Memory of the tag columns as text and as bitsets, and the cost of a filter on each."""
+    import time
+
+    from data_loader import MAIN_DATA_PATH
+
+    path = path or MAIN_DATA_PATH
+    text = pd.read_csv(path, usecols=['Position'] + list(tag_columns), encoding='utf-8-sig',
+                       dtype={'Position': 'category', **{col: 'string' for col in tag_columns}})
+    start = time.perf_counter()
+    encoded = encode_tags(text)
+    encode_s = time.perf_counter() - start
+
+    def mb(frame, columns):
+        return frame[columns].memory_usage(deep=True, index=False).sum() / 2 ** 20
+
+    print(f"{len(text)} players, encoded in {encode_s * 1000:.1f} ms")
+    print(f"{'':<34} {'text':>10} {'bitsets':>10}")
+    print(f"{'Player Abilities (+ PlayStyles+)':<34} {mb(text, ['Player Abilities']):>7.2f} MB "
+          f"{mb(encoded, ['Player Abilities', PLUS_COLUMN]):>7.2f} MB")
+    print(f"{'Alternate Positions':<34} {mb(text, ['Alternate Positions']):>7.2f} MB "
+          f"{mb(encoded, ['Alternate Positions']):>7.2f} MB")
+
+    # The same filter on the text columns, as a page would have had to run it
+    def text_filter():
+        abilities = text['Player Abilities'].fillna('').str.split(SEPARATOR)
+        alternates = text['Alternate Positions'].fillna('').str.split(SEPARATOR)
+        has = abilities.map(lambda tokens: {token.rstrip(PLUS) for token in tokens} >= {'Rapid', 'Flair'})
+        plays = (text['Position'] == 'LW') | alternates.map(lambda tokens: 'LW' in tokens)
+        return (has & plays).to_numpy()
+
+    player_filter = PlayerFilter.of(['Rapid', 'Flair'], positions=['LW'])
+    for label, run in (("filter on text", text_filter), ("filter on bitsets", lambda: player_filter.mask(encoded))):
+        start = time.perf_counter()
+        matched = run()
+        print(f"{label:<34} {(time.perf_counter() - start) * 1000:>7.2f} ms  ({int(matched.sum())} players: "
+              f"{player_filter.describe()})")
+
+
+if __name__ == "__main__":
+    report(*sys.argv[1:2])
@@ -0,0 +1,203 @@
+"""Static pre-rendering of the most requested dashboard views, for a cache/CDN tier.
+
+    python prerender.py [--views defaults single-feature single-league] [--config views.json]
+                        [--out static/] [--workers N] [--standalone]
+
+Each view is one (page, selection) pair, rendered by the same figures.page_figures builder
+and backend that the live pages use. Three sets of views are built in:
+
+    defaults        what each page shows on first load, with and without error bars
+    single-feature  Africa and Ages with one feature, for every feature the page offers
+    single-league   Men vs Women with one league, for every league
+
+--config adds views from a JSON list of {"page": ..., "selection": {...}}. A selection
+only needs the widget values that differ from the page's defaults. A player_filter is
+given as {"playstyles": [...], "playstyles_plus": [...], "positions": [...]}.
+
+Views are rendered in a process pool. Each one becomes <id>.json (the figure, as the live
+page sends it) and <id>.html (a full page loading the plotly.min.js written next to it, or
+with plotly.js inlined under --standalone). manifest.json lists every view with:
+- its page and selection
+- its lookup key, from view_key(page, selection)
+- the dataset version and renderer hash it was built from
+- the sha1 of its files
+
+A static server answers a request by computing the same key and serving the files. On
+later runs, views whose dataset version, renderer code and files are unchanged are skipped.
+Views left out of a run stay in the manifest while they are current. Once their dataset
+version or renderer is out of date, they are removed together with their files.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from data_loader import BASE_DIR, non_gk_features, quantitative_features
+from figure_cache import normalize_selection
+from figures import default_selections, page_figures, warm_selections
+from manifests import file_matches, read_manifest, source_hash, write_atomic, write_manifest
+from player_tags import PlayerFilter
+
+STATIC_DIR = os.environ.get('DASHBOARD_STATIC_DIR', os.path.join(BASE_DIR, 'static'))
+PLOTLY_JS = 'plotly.min.js'
+# Code whose changes invalidate the rendered views
+RENDER_SOURCES = ['data_loader.py', 'player_tags.py', 'enrichment.py', 'aggregates.py', 'regression.py',
+                  'query_backend.py', 'figures.py', 'prerender.py']
+
+
+def renderer_hash():
+    return source_hash(RENDER_SOURCES)
+
+
+# ---- Views ----
+def view_key(page, selection):
+    """Canonical text of a view: the figure cache's normalized selection, as JSON."""
+    return json.dumps([page, normalize_selection(selection)], separators=(',', ':'), ensure_ascii=False)
+
+
+def view_id(page, selection):
+    return hashlib.sha1(view_key(page, selection).encode()).hexdigest()[:16]
+
+
+def _selection(page, values):
+    # Widget values from a config file on top of the page defaults; lists stay lists
+    selection = dict(default_selections[page], **values)
+    if isinstance(selection.get('player_filter'), dict):
+        selection['player_filter'] = PlayerFilter.of(**selection['player_filter'])
+    if selection.get('age_range') is not None:
+        selection['age_range'] = tuple(selection['age_range'])
+    return selection
+
+
+def view_sets(backend):
+    return {
+        'defaults': list(warm_selections),
+        'single-feature': [('Africa', _selection('Africa', dict(features=[feature])))
+                           for feature in quantitative_features] +
+                          [('Ages', _selection('Ages', dict(features=[feature]))) for feature in non_gk_features],
+        'single-league': [('Men vs Women', _selection('Men vs Women', dict(leagues=[league])))
+                          for league in backend.league_options('All')],
+    }
+
+
+def read_config(path):
+    with open(path) as f:
+        return [(entry['page'], _selection(entry['page'], entry.get('selection', {}))) for entry in json.load(f)]
+
+
+def _json_selection(selection):
+    return {name: value._asdict() if isinstance(value, PlayerFilter) else value for name, value in selection.items()}
+
+
+# ---- Rendering ----
+def _render_view(item, out_dir, standalone):
+    # Runs in a worker: get_backend() gives the same dataset the live pages read
+    from query_backend import get_backend
+
+    vid, page, selection = item
+    start = time.perf_counter()
+    fig = page_figures[page](get_backend(), **selection)
+    files = {}
+    payload = fig.to_json()
+    files['json'] = write_atomic(os.path.join(out_dir, f"{vid}.json"), lambda f: f.write(payload.encode()))
+    html = fig.to_html(include_plotlyjs=True if standalone else PLOTLY_JS, full_html=True)
+    files['html'] = write_atomic(os.path.join(out_dir, f"{vid}.html"), lambda f: f.write(html.encode()))
+    return vid, files, time.perf_counter() - start
+
+
+def _up_to_date(entry, out_dir, version, standalone):
+    if entry is None or entry['dataset_version'] != version or entry['renderer'] != renderer_hash():
+        return False
+    if entry.get('standalone', False) != standalone:
+        return False
+    return all(file_matches(os.path.join(out_dir, f"{entry['id']}.{kind}"), sha1)
+               for kind, sha1 in entry['files'].items())
+
+
+def _write_plotly_js(out_dir):
+    from plotly.offline import get_plotlyjs
+
+    path = os.path.join(out_dir, PLOTLY_JS)
+    if not os.path.exists(path):
+        write_atomic(path, lambda f: f.write(get_plotlyjs().encode()))
+
+
+def render(views, out_dir=STATIC_DIR, workers=None, standalone=False):
+    """Render every stale view in ``views`` ([(page, selection)]) into ``out_dir``; returns the manifest."""
+    from query_backend import get_backend
+
+    os.makedirs(out_dir, exist_ok=True)
+    version = get_backend().version  # loaded here first, so forked workers start with it
+    old = (read_manifest(out_dir) or {}).get('views', {})
+    if not standalone:
+        _write_plotly_js(out_dir)
+
+    entries, stale = {}, []
+    for page, selection in views:
+        vid = view_id(page, selection)
+        if vid in entries:
+            continue
+        entries[vid] = dict(id=vid, page=page, selection=_json_selection(selection), key=view_key(page, selection),
+                            dataset_version=version, renderer=renderer_hash(), standalone=standalone)
+        if _up_to_date(old.get(vid), out_dir, version, standalone):
+            entries[vid]['files'] = old[vid]['files']
+        else:
+            stale.append((vid, page, selection))
+    print(f"{len(entries)} views, {len(entries) - len(stale)} up to date, {len(stale)} to render")
+
+    start = time.perf_counter()
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = pool.map(partial(_render_view, out_dir=out_dir, standalone=standalone), stale,
+                                chunksize=max(1, len(stale) // (4 * (workers or os.cpu_count() or 1))))
+            for vid, files, seconds in rendered:
+                entries[vid]['files'] = files
+                entry = entries[vid]
+                print(f"{entry['page']:<14} {vid} {seconds * 1000:>8.0f} ms")
+    print(f"{'rendered':<31} {(time.perf_counter() - start) * 1000:>8.0f} ms")
+
+    # Views not asked for this time stay listed while still current; stale ones are removed,
+    # so the manifest never points at a figure of another dataset version
+    for vid in old.keys() - entries.keys():
+        if _up_to_date(old[vid], out_dir, version, standalone):
+            entries[vid] = old[vid]
+            continue
+        for kind in old[vid].get('files', {}):
+            path = os.path.join(out_dir, f"{vid}.{kind}")
+            if os.path.exists(path):
+                os.remove(path)
+
+    manifest = dict(dataset_version=version, renderer=renderer_hash(), views=entries)
+    write_manifest(out_dir, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--views', nargs='*', default=['defaults', 'single-feature', 'single-league'],
+                        help="built-in view sets to render (default: all of them)")
+    parser.add_argument('--config', help="JSON file with more views")
+    parser.add_argument('--out', default=STATIC_DIR, help="output directory (default: static/)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--standalone', action='store_true', help="inline plotly.js in every HTML file")
+    args = parser.parse_args()
+
+    from query_backend import get_backend
+
+    sets = view_sets(get_backend())
+    unknown = set(args.views) - sets.keys()
+    if unknown:
+        parser.error(f"unknown view sets: {', '.join(sorted(unknown))}; choose from {', '.join(sets)}")
+    views = [view for name in args.views for view in sets[name]]
+    if args.config:
+        views += read_config(args.config)
+    start = time.perf_counter()
+    render(views, args.out, args.workers, args.standalone)
+    print(f"{'total':<31} {(time.perf_counter() - start) * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
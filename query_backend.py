@@ -0,0 +1,481 @@
+"""Query backends behind the page aggregations.
+
+Pages ask a backend for exactly the aggregates and columns they draw:
+
+    group_means(key, features)             Africa: per-region means
+    group_mean_ci(key, features)           Africa: bootstrap 95% intervals of those means
+    age_means(lo, hi, features)            Ages: per-age means in an age window
+    age_mean_ci(lo, hi, features)          Ages: bootstrap 95% intervals of those means
+    league_options(gender_filter)          Men vs Women: leagues present for a gender
+    points(columns, gender_filter, leagues)  Men vs Women: the scatter points
+    trend_lines(gender_filter, leagues, x_axis, y_axis)
+    similar_players(row, name, team, k, gender_filter, leagues, age_range)  Men vs Women: nearest neighbours
+    player_count(player_filter)            every page: players passing a PlayStyle/position filter
+
+All but league_options and similar_players also take an optional player_tags.PlayerFilter.
+Without one the precomputed aggregates answer; with one they are computed over the players
+who pass it.
+
+PandasBackend answers from the shared in-memory frame and its cached aggregates.
+ArrowBackend scans Parquet files batch by batch with pyarrow.dataset, pushing the
+gender/league/age filters down to the reader and reading only the requested columns, so
+the data never has to fit in memory; its query results are kept in an LRU of
+DASHBOARD_ARROW_CACHE_MB (default 512). Select one with DASHBOARD_BACKEND=pandas|arrow and
+DASHBOARD_PARQUET_PATH (a file or a directory of files written by ``export``):
+
+    python query_backend.py export parquet/ ea_sports_fc_player_ratings.csv other_edition.csv
+"""
+import hashlib
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+import refresh
+from aggregates import AgeIndex, BootstrapCI, GroupStats, age_index, bootstrap_ci, cached, group_stats, warm_group_stats
+from artifacts import seed_cache
+from caching import LRUCache
+from data_loader import BASE_DIR, dataset_version, load_ratings, quantitative_features
+from player_tags import FILTER_COLUMNS
+from regression import PairStats, TrendTable, trend_table
+from similarity import SimilarityIndex, similarity_index
+
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+PARQUET_PATH = os.environ.get('DASHBOARD_PARQUET_PATH', os.path.join(BASE_DIR, 'parquet'))
+# Bound on the query results an ArrowBackend keeps, least recently used dropped first
+ARROW_CACHE_MB = float(os.environ.get('DASHBOARD_ARROW_CACHE_MB', 512))
+
+gender_labels = {"Men": "Men's Football", "Women": "Women's Football"}
+
+
+def _gender_value(gender_filter):
+    return gender_labels.get(gender_filter)
+
+
+def _unique(columns):
+    return list(dict.fromkeys(columns))
+
+
+def _age_window(frames, lo, hi):
+    return tuple(frame[(frame.index >= lo) & (frame.index <= hi)] for frame in frames)
+
+
+def _point_trend_lines(points, x_axis, y_axis):
+    features = _unique([x_axis, y_axis])
+    lines = {}
+    for gender in points.genders:
+        values = np.column_stack([points.column(gender, feature) for feature in features])
+        lines[gender] = TrendTable(PairStats.from_values(features, values)).line(x_axis, y_axis)
+    return lines
+
+
+similar_columns = ['Name', 'Team', 'Position', 'Gender', 'League_Nation', 'Age', 'Rating']
+ROW_COLUMN = '__row'
+
+
+def _similar(frame, index, row, name, team, k, gender_filter, leagues, age_range):
+    # frame holds similar_columns in dataset row order. ``row`` comes from a click on a figure that
+    # may predate a refresh, so it must still hold that player; None when it doesn't
+    if not 0 <= row < len(index) or index.names[row] != name or index.teams[row] != team:
+        return None
+    rows, scores = index.query(row, k, _gender_value(gender_filter), leagues, age_range)
+    return frame[similar_columns].iloc[rows].assign(Similarity=scores).reset_index(drop=True)
+
+
+# ---- Point selections ----
+def _numpy_column(column):
+    # Ratings stay numeric; text and categoricals become object arrays, which Plotly serializes as-is
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.categories.to_numpy(dtype=object)[column.cat.codes.to_numpy()]
+    if column.dtype.kind in 'iuf':
+        return column.to_numpy()
+    return column.to_numpy(dtype=object)
+
+
+def _deep_nbytes(values, column):
+    # Categorical-derived object arrays point at the shared category strings; text columns own theirs
+    if values.dtype != object or isinstance(column.dtype, pd.CategoricalDtype):
+        return values.nbytes
+    return values.nbytes + sum(map(sys.getsizeof, values))
+
+
+class PointSet:
+    """Players selected for the scatter, as row indices per gender into full-length columns.
+
+    With the pandas backend the columns are the shared, read-only arrays of the dataset, so a
+    session's selection costs only its index arrays; values are gathered per trace while the
+    figure is built. ``ids`` maps rows of the columns to dataset rows when the columns hold
+    only the selected players (Arrow); without it the rows are the dataset rows.
+    """
+
+    def __init__(self, columns, rows, ids=None):
+        self._columns = columns
+        self._rows = rows
+        self._ids = ids
+
+    @classmethod
+    def from_frame(cls, frame, ids=None):
+        columns = {name: _numpy_column(frame[name]) for name in frame.columns if name != 'Gender'}
+        genders = frame['Gender'].to_numpy(dtype=object)
+        rows = {gender: np.flatnonzero(genders == gender).astype(np.int32) for gender in sorted(set(genders))}
+        return cls(columns, rows, ids)
+
+    @property
+    def genders(self):
+        return list(self._rows)
+
+    def __len__(self):
+        return sum(len(rows) for rows in self._rows.values())
+
+    @property
+    def nbytes(self):
+        return sum(rows.nbytes for rows in self._rows.values())
+
+    def column(self, gender, name):
+        return self._columns[name][self._rows[gender]]
+
+    def row_ids(self, gender):
+        """Dataset rows of this gender's points, as SimilarityIndex and similar_players take them."""
+        rows = self._rows[gender]
+        return rows if self._ids is None else self._ids[rows]
+
+
+# ---- In-memory pandas ----
+def _read_only(values):
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+class PandasBackend:
+    """Queries over the single shared frame. Nothing here writes to it or copies it per session."""
+
+    def __init__(self, df):
+        self.df = df
+        self.version = dataset_version(df)
+
+    def _shared_columns(self):
+        return cached(self.df, 'shared_columns', None, dict)
+
+    def shared_column(self, name):
+        # Full-length NumPy column shared by every session; text columns are converted once per version
+        columns = self._shared_columns()
+        entry = columns.get(name)
+        if entry is None:
+            values = _numpy_column(self.df[name])
+            entry = columns.setdefault(name, (_read_only(values), _deep_nbytes(values, self.df[name])))
+        return entry[0]
+
+    def memory_bytes(self):
+        """Bytes held once per process for this dataset version: the frame and the shared scatter columns."""
+        dataset = cached(self.df, 'memory_usage', None, lambda: int(self.df.memory_usage(deep=True).sum()))
+        return dict(dataset=dataset, shared_columns=sum(nbytes for _, nbytes in self._shared_columns().values()))
+
+    def warm(self):
+        seed_cache(self.df)
+        warm_group_stats(self.df)
+
+    def player_count(self, player_filter):
+        return len(self.df) if player_filter is None else int(player_filter.mask(self.df).sum())
+
+    def group_means(self, key, features, player_filter=None):
+        if player_filter is not None:
+            return GroupStats.from_frame(self.df, key, list(features), mask=player_filter.mask(self.df)).mean(features)
+        return group_stats(self.df, key).mean(features)
+
+    def age_means(self, lo, hi, features, player_filter=None):
+        if player_filter is not None:
+            index = AgeIndex.from_frame(self.df, features=list(features), mask=player_filter.mask(self.df))
+            return index.curve(lo, hi, features)
+        return age_index(self.df).curve(lo, hi, features)
+
+    def group_mean_ci(self, key, features, player_filter=None):
+        if player_filter is not None:
+            ci = BootstrapCI.from_frame(self.df, key, list(features), mask=player_filter.mask(self.df))
+            return ci.interval(features)
+        return bootstrap_ci(self.df, key).interval(features)
+
+    def age_mean_ci(self, lo, hi, features, player_filter=None):
+        if player_filter is not None:
+            ci = BootstrapCI.from_frame(self.df, 'Age', list(features), mask=player_filter.mask(self.df))
+        else:
+            ci = bootstrap_ci(self.df, 'Age')
+        return _age_window(ci.interval(features), lo, hi)
+
+    def league_options(self, gender_filter):
+        def build():
+            df = self.df
+            gender = _gender_value(gender_filter)
+            players = df if gender is None else df[df['Gender'] == gender]
+            return sorted(players['League_Nation'].unique().tolist())
+
+        return cached(self.df, 'league_options', gender_filter, build)
+
+    def points(self, columns, gender_filter, leagues, player_filter=None):
+        df = self.df
+        league = df['League_Nation'].cat
+        gender = df['Gender'].cat
+        # Boolean lookup over the league categories, applied to the codes: no frame is built
+        league_ok = np.ones(len(league.categories), dtype=bool)
+        if leagues is not None:
+            league_ok = league.categories.isin(leagues)
+        mask = league_ok[league.codes.to_numpy()]
+        if player_filter is not None:
+            mask &= player_filter.mask(df)
+
+        wanted = _gender_value(gender_filter)
+        gender_codes = gender.codes.to_numpy()
+        rows = {}
+        for code, label in enumerate(gender.categories):
+            if wanted is not None and label != wanted:
+                continue
+            selected = np.flatnonzero(mask & (gender_codes == code)).astype(np.int32)
+            if len(selected):
+                rows[label] = selected
+        return PointSet({name: self.shared_column(name) for name in _unique(columns) if name != 'Gender'}, rows)
+
+    def trend_lines(self, gender_filter, leagues, x_axis, y_axis, player_filter=None):
+        if player_filter is not None:
+            points = self.points(['Gender', x_axis, y_axis], gender_filter, leagues, player_filter)
+            return _point_trend_lines(points, x_axis, y_axis)
+        gender = _gender_value(gender_filter)
+        genders = [gender] if gender is not None else self.df['Gender'].cat.categories
+        lines = {}
+        for g in genders:
+            table = trend_table(self.df, g, leagues)
+            if table is not None:
+                lines[g] = table.line(x_axis, y_axis)
+        return lines
+
+    def similar_players(self, row, name, team, k=10, gender_filter="All", leagues=None, age_range=None):
+        return _similar(self.df, similarity_index(self.df), row, name, team, k, gender_filter, leagues, age_range)
+
+
+# ---- Out-of-core Arrow dataset ----
+def _parquet_files(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(path)
+                      for name in names if name.endswith('.parquet'))
+    return [path]
+
+
+def parquet_version(path):
+    h = hashlib.sha1()
+    for file in _parquet_files(path):
+        stat = os.stat(file)
+        h.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def _result_bytes(value):
+    # Approximate size of a memoized query result, for the cache bound
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(size, pd.Series) else int(size)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(map(_result_bytes, value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(map(_result_bytes, value.values()))
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + _result_bytes(vars(value))
+    return sys.getsizeof(value)
+
+
+class ArrowBackend:
+    def __init__(self, path, batch_size=1 << 18, cache_bytes=None):
+        import pyarrow.dataset as ds
+
+        self.path = path
+        self.version = parquet_version(path)
+        self.dataset = ds.dataset(_parquet_files(path), format='parquet')
+        self.batch_size = batch_size
+        # Built outside the cache lock, once per key: a slow scan holds up only callers of the same query
+        self._cache = LRUCache(int(ARROW_CACHE_MB * 1024 * 1024) if cache_bytes is None else cache_bytes,
+                               size=_result_bytes)
+
+    def warm(self):
+        pass
+
+    def memory_bytes(self):
+        # Only query results are kept; the Parquet data stays on disk
+        return dict(dataset=0, shared_columns=0)
+
+    def _memo(self, key, build):
+        return self._cache.get_or_build(key, build)
+
+    def _filter(self, gender_filter=None, leagues=None, age_range=None, player_filter=None):
+        import pyarrow.compute as pc
+
+        expr = None if player_filter is None else player_filter.expression()
+        gender = _gender_value(gender_filter)
+        if gender is not None:
+            cond = pc.field('Gender') == gender
+            expr = cond if expr is None else expr & cond
+        if leagues is not None:
+            # isin() needs a typed value set, which an empty list can't give; nothing matches anyway
+            cond = pc.field('League_Nation').isin(list(leagues)) if len(leagues) else pc.scalar(False)
+            expr = cond if expr is None else expr & cond
+        if age_range is not None:
+            cond = (pc.field('Age') >= age_range[0]) & (pc.field('Age') <= age_range[1])
+            expr = cond if expr is None else expr & cond
+        return expr
+
+    def _batches(self, columns, expr):
+        return self.dataset.to_batches(columns=_unique(columns), filter=expr, batch_size=self.batch_size)
+
+    def _grouped_sums(self, key, features, expr):
+        import pyarrow as pa
+
+        # Partial sums per batch, merged as we go: memory stays O(groups x features)
+        count, total = {}, {}
+        for batch in self._batches([key] + features, expr):
+            if batch.num_rows == 0:
+                continue
+            table = pa.Table.from_batches([batch]).drop_null()
+            grouped = table.group_by(key).aggregate([(f, 'sum') for f in features] + [(key, 'count')])
+            labels = grouped.column(key).to_pylist()
+            sums = np.column_stack([grouped.column(f"{f}_sum").to_numpy(zero_copy_only=False) for f in features])
+            counts = grouped.column(f"{key}_count").to_numpy(zero_copy_only=False)
+            for label, n, row in zip(labels, counts, sums.astype(np.float64)):
+                count[label] = count.get(label, 0) + int(n)
+                total[label] = total.get(label, 0) + row
+        labels = sorted(count)
+        means = np.array([total[label] / count[label] for label in labels]).reshape(len(labels), len(features))
+        return labels, means
+
+    def player_count(self, player_filter):
+        return self._memo(('player_count', player_filter),
+                          lambda: self.dataset.count_rows(filter=self._filter(player_filter=player_filter)))
+
+    def group_means(self, key, features, player_filter=None):
+        def build():
+            labels, means = self._grouped_sums(key, list(features), self._filter(player_filter=player_filter))
+            return pd.DataFrame(means, index=pd.Index(labels, name=key), columns=list(features))
+
+        return self._memo(('group_means', key, tuple(features), player_filter), build)
+
+    def age_means(self, lo, hi, features, player_filter=None):
+        def build():
+            expr = self._filter(age_range=(lo, hi), player_filter=player_filter)
+            labels, means = self._grouped_sums('Age', list(features), expr)
+            return pd.DataFrame(means, index=pd.Index(np.array(labels, dtype=np.int64), name='Age'),
+                                columns=list(features))
+
+        return self._memo(('age_means', lo, hi, tuple(features), player_filter), build)
+
+    def _bootstrap_ci(self, key, features, player_filter):
+        # Resampling needs the rows: read just the key and the features shown, one byte per rating.
+        # The draws don't depend on the features, so the intervals match a bootstrap over all of them.
+        def build():
+            frame = self.dataset.to_table(columns=_unique([key] + features),
+                                          filter=self._filter(player_filter=player_filter)).to_pandas()
+            return BootstrapCI.from_frame(frame, key, features)
+
+        features = sorted(features)
+        return self._memo(('bootstrap_ci', key, tuple(features), player_filter), build)
+
+    def group_mean_ci(self, key, features, player_filter=None):
+        return self._bootstrap_ci(key, features, player_filter).interval(features)
+
+    def age_mean_ci(self, lo, hi, features, player_filter=None):
+        return _age_window(self._bootstrap_ci('Age', features, player_filter).interval(features), lo, hi)
+
+    def league_options(self, gender_filter):
+        import pyarrow.compute as pc
+
+        def build():
+            leagues = set()
+            for batch in self._batches(['League_Nation'], self._filter(gender_filter)):
+                leagues.update(pc.unique(batch.column(0)).to_pylist())
+            leagues.discard(None)
+            return sorted(leagues)
+
+        return self._memo(('league_options', gender_filter), build)
+
+    def points(self, columns, gender_filter, leagues, player_filter=None):
+        import pyarrow as pa
+
+        # Filtered batch by batch after the read rather than in the scan, so that every player keeps
+        # their dataset row: the position in the files, in order, that similar_players takes
+        expr = self._filter(gender_filter, leagues, player_filter=player_filter)
+        read = _unique(columns + ['Gender', 'League_Nation'] + (FILTER_COLUMNS if player_filter is not None else []))
+        parts, offset = [], 0
+        for fragment in self.dataset.get_fragments():
+            for batch in fragment.to_batches(columns=read, batch_size=self.batch_size):
+                table = pa.Table.from_batches([batch]).append_column(
+                    ROW_COLUMN, pa.array(np.arange(offset, offset + batch.num_rows, dtype=np.int64)))
+                offset += batch.num_rows
+                parts.append(table if expr is None else table.filter(expr))
+        if not parts:
+            return PointSet({}, {})
+        frame = pa.concat_tables(parts).to_pandas()
+        return PointSet.from_frame(frame[_unique(columns)], frame[ROW_COLUMN].to_numpy())
+
+    def trend_lines(self, gender_filter, leagues, x_axis, y_axis, player_filter=None):
+        def build():
+            features = _unique([x_axis, y_axis])
+            stats = {}
+            expr = self._filter(gender_filter, leagues, player_filter=player_filter)
+            for batch in self._batches(['Gender'] + features, expr):
+                frame = batch.to_pandas()
+                for gender, part in frame.groupby('Gender', observed=True):
+                    part_stats = PairStats.from_values(features, part[features].to_numpy())
+                    stats[gender] = stats[gender] + part_stats if gender in stats else part_stats
+            return {gender: TrendTable(s).line(x_axis, y_axis) for gender, s in stats.items() if s.n}
+
+        key = ('trend_lines', gender_filter, tuple(sorted(leagues)) if leagues is not None else None, x_axis, y_axis,
+               player_filter)
+        return self._memo(key, build)
+
+    def similar_players(self, row, name, team, k=10, gender_filter="All", leagues=None, age_range=None):
+        # The index needs every player's ratings in memory (float32); it is read once
+        def build():
+            frame = self.dataset.to_table(columns=_unique(similar_columns + quantitative_features)).to_pandas()
+            return frame[similar_columns], SimilarityIndex.from_frame(frame)
+
+        frame, index = self._memo(('similarity_index',), build)
+        return _similar(frame, index, row, name, team, k, gender_filter, leagues, age_range)
+
+
+# ---- Selection ----
+_arrow_backends = {}
+_arrow_lock = threading.Lock()
+
+
+def get_backend(kind=None, parquet_path=None):
+    kind = kind or BACKEND
+    if kind == 'pandas':
+        if refresh.ENABLED:
+            return PandasBackend(refresh.current())
+        return PandasBackend(load_ratings())
+    if kind == 'arrow':
+        path = parquet_path or PARQUET_PATH
+        version = parquet_version(path)
+        with _arrow_lock:
+            backend = _arrow_backends.get(path)
+            if backend is None or backend.version != version:
+                backend = _arrow_backends[path] = ArrowBackend(path)
+            return backend
+    raise ValueError(f"Unknown query backend {kind!r}; expected 'pandas' or 'arrow'")
+
+
+def export(out_dir, csv_paths):
+    """Write each ratings CSV, typed and enriched, as one Parquet file for the Arrow backend."""
+    os.makedirs(out_dir, exist_ok=True)
+    for csv_path in csv_paths:
+        df = load_ratings(csv_path, use_snapshot=False)
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        out = os.path.join(out_dir, f"{name}.parquet")
+        df.to_parquet(out, index=False, row_group_size=1 << 17)
+        print(out)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != 'export':
+        print(__doc__)
+        sys.exit(1)
+    export(sys.argv[2], sys.argv[3:])
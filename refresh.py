@@ -0,0 +1,256 @@
+"""Incremental refresh of the ratings dataset while the CSV is being written to.
+
+With DASHBOARD_REFRESH=1 the pandas backend loads the ratings through ``current()`` instead
+of data_loader.load_ratings, and a watcher thread checks the file every
+DASHBOARD_REFRESH_INTERVAL seconds. Only the watcher refreshes; ``current()`` hands out the
+frame it last published, so the work below happens off the request path:
+
+- Rows appended at the end: the bytes parsed so far are hashed again to make sure they are
+  unchanged, then only the bytes past them are parsed. A row whose Name + Team + Birthdate
+  key already exists replaces the old one (a live-rating update); the others are new players.
+- Anything else (rows edited in place, even at the same width, the file truncated or
+  replaced): the file is parsed again and diffed against the current frame row by row.
+
+Either way the derived columns are computed for the changed rows only, and the cached group
+stats, age index and regression statistics are moved forward with ``aggregates.advance``
+rather than rebuilt. The new frame is published under a new version in one step, so a
+session sees either the old or the new dataset for a whole rerun, never a mix.
+
+In this mode the dataset holds the latest row per key, the first load included.
+"""
+import hashlib
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import advance
+from data_loader import BIRTHDATE_FORMAT, MAIN_DATA_PATH, category_columns, read_ratings_csv
+from enrichment import enrich
+from instrumentation import span
+from player_tags import decode_tags
+
+ENABLED = os.environ.get('DASHBOARD_REFRESH', '') not in ('', '0')
+REFRESH_INTERVAL_S = float(os.environ.get('DASHBOARD_REFRESH_INTERVAL', 2))
+KEY = ['Name', 'Team', 'Birthdate']
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Parsing pieces of the file ----
+def _read_lines(path, start=0):
+    """Bytes from ``start`` up to the last complete line; a row still being written is left for later."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read()
+    return data[:data.rfind(b'\n') + 1]
+
+
+def _drop_unused_categories(df):
+    # Categories whose last player was replaced; a bincount is much cheaper than remove_unused_categories
+    columns = {}
+    for col in category_columns:
+        codes = df[col].cat.codes.to_numpy()
+        used = np.bincount(codes[codes >= 0], minlength=len(df[col].cat.categories)) > 0
+        if not used.all():
+            columns[col] = df[col].cat.remove_categories(df[col].cat.categories[~used])
+    return df.assign(**columns) if columns else df
+
+
+def _latest(df):
+    # One row per key; a later row for the same player replaces the earlier one
+    replaced = df.duplicated(KEY, keep='last').to_numpy()
+    if not replaced.any():
+        return df
+    return _drop_unused_categories(df[~replaced].reset_index(drop=True))
+
+
+def _parse(header, data):
+    return enrich(_latest(read_ratings_csv(io.BytesIO(header + data))))
+
+
+def _key_hashes(df):
+    return pd.util.hash_pandas_object(df[KEY], index=False).to_numpy()
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _concat(old, new):
+    # Category columns get the sorted union of both sides' categories, as a full parse would
+    columns = {}
+    for col in category_columns:
+        categories = sorted(set(old[col].cat.categories) | set(new[col].cat.categories))
+        columns[col] = [frame[col].cat.set_categories(categories) for frame in (old, new)]
+    old = old.assign(**{col: parts[0] for col, parts in columns.items()})
+    new = new.assign(**{col: parts[1] for col, parts in columns.items()})
+    return pd.concat([old, new], ignore_index=True)
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# ---- Tracked file ----
+class TrackedFile:
+    """The current frame of one CSV, plus what is needed to read only what comes after it."""
+
+    def __init__(self, path):
+        self.path = path
+        stat_key = _stat_key(path)  # taken before reading: a write during the read shows up next time
+        data = _read_lines(path)
+        self.header = data[:data.find(b'\n') + 1]
+        self._hasher = hashlib.sha1(data)  # of the bytes parsed so far, data[:offset]
+        self.df = self._publish(_parse(b'', data))
+        self._mark(stat_key, len(data))
+
+    def _publish(self, df, keys=None):
+        df.attrs['dataset_version'] = self._hasher.hexdigest()
+        self.keys = _key_hashes(df) if keys is None else keys
+        return df
+
+    def _mark(self, stat_key, offset):
+        self.offset = offset
+        self.stat_key = stat_key
+
+    def _unchanged_prefix(self, contents):
+        # Every byte parsed so far must still be in place; an edit anywhere before the offset is a rewrite
+        return (len(contents) >= self.offset and
+                hashlib.sha1(memoryview(contents)[:self.offset]).digest() == self._hasher.digest())
+
+    def refresh(self):
+        """Bring the frame up to date with the file; returns (added, removed) rows, or None if unchanged."""
+        stat_key = _stat_key(self.path)
+        if stat_key == self.stat_key:
+            return None
+        contents = _read_lines(self.path)
+        old = self.df
+        if self._unchanged_prefix(contents):
+            data = contents[self.offset:]
+            if not data:
+                # Touched, or a row is still being written: nothing to parse until its line ends
+                self._mark(stat_key, self.offset)
+                return None
+            added = _parse(self.header, data)
+            added_keys = _key_hashes(added)
+            replaced = pd.Index(self.keys).isin(added_keys)
+            removed = old[replaced]
+            df = _concat(old[~replaced], added)
+            if replaced.any():
+                df = _drop_unused_categories(df)
+            keys = np.concatenate([self.keys[~replaced], added_keys])
+            self._hasher.update(data)
+        else:
+            data = contents
+            df = _parse(b'', data)
+            old_rows, new_rows = _row_hashes(old), _row_hashes(df)
+            removed = old[~np.isin(old_rows, new_rows)]
+            added = df[~np.isin(new_rows, old_rows)]
+            self.header = data[:data.find(b'\n') + 1]
+            self._hasher = hashlib.sha1(data)
+            keys = None
+
+        df = self._publish(df, keys)
+        with span('refresh_aggregates'):
+            advance(old, df, added, removed)
+        self.df = df
+        self._mark(stat_key, len(contents))
+        return added, removed
+
+
+# ---- Shared, refreshed dataset ----
+_tracked = {}
+_lock = threading.Lock()
+_watchers = set()
+
+
+def current(path=MAIN_DATA_PATH):
+    """The ratings frame for ``path`` as of the watcher's last refresh; only the first call parses."""
+    path = os.path.abspath(path)
+    with _lock:
+        tracked = _tracked.get(path)
+        if tracked is None:
+            with span('parse'):
+                tracked = _tracked[path] = TrackedFile(path)
+    start_watcher(path)
+    return tracked.df
+
+
+def _watch(path, interval):
+    # The only caller of refresh() for this path, so the request path never waits on a parse
+    while True:
+        time.sleep(interval)
+        with _lock:
+            tracked = _tracked.get(path)
+        if tracked is None:
+            continue  # cleared; the next current() call loads it again
+        try:
+            tracked.refresh()
+        except Exception:
+            # A malformed write must not stop the watcher; the file is read again on the next poll
+            logger.warning("Refreshing %s failed; retrying in %g s", path, interval, exc_info=True)
+
+
+def start_watcher(path=MAIN_DATA_PATH, interval=REFRESH_INTERVAL_S):
+    """Poll ``path`` on a daemon thread so refreshes don't wait for the next rerun."""
+    path = os.path.abspath(path)
+    with _lock:
+        if path in _watchers:
+            return
+        _watchers.add(path)
+    threading.Thread(target=_watch, args=(path, interval), name='ratings-refresh', daemon=True).start()
+
+
+def clear():
+    with _lock:
+        _tracked.clear()
+
+
+# ---- Refresh report ----
+def _timed(action):
+    start = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - start
+
+
+def _warm(df):
+    from aggregates import age_index, warm_group_stats
+    from regression import cell_stats
+
+    warm_group_stats(df)
+    age_index(df)
+    cell_stats(df)
+
+
+def report(path=MAIN_DATA_PATH, rows=1000):
+    """Full reload vs incremental refresh after appending ``rows`` new players and ``rows`` updates."""
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        tracked, load_s = _timed(lambda: TrackedFile(copy))
+        _, warm_s = _timed(lambda: _warm(tracked.df))
+        print(f"{'full load + aggregates':<28} {(load_s + warm_s) * 1000:>9.1f} ms  ({len(tracked.df)} players)")
+
+        sample = tracked.df.sample(2 * rows, random_state=0).drop(columns=['region', 'League_Nation', 'Age'])
+        new_players = sample[:rows].assign(Name=sample['Name'][:rows] + ' (new)')
+        updates = sample[rows:].assign(Rating=sample['Rating'][rows:] // 2)
+        for label, chunk in (("append new players", new_players), ("append rating updates", updates)):
+            chunk = decode_tags(chunk).assign(Birthdate=chunk['Birthdate'].dt.strftime(BIRTHDATE_FORMAT))
+            with open(copy, 'a', encoding='utf-8', newline='') as f:
+                chunk.to_csv(f, header=False, index=False, lineterminator='\r\n')
+            (added, removed), refresh_s = _timed(tracked.refresh)
+            print(f"{label:<28} {refresh_s * 1000:>9.1f} ms  (+{len(added)} / -{len(removed)} rows)")
+
+
+if __name__ == "__main__":
+    report(*sys.argv[1:2])
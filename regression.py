@@ -0,0 +1,155 @@
+import numpy as np
+
+from aggregates import cached, register_updater
+from data_loader import non_gk_features
+
+RATING_LEVELS = 256  # one histogram bin per uint8 value
+
+
+# ---- Sufficient statistics ----
+class PairStats:
+    """Player count, feature sums, cross-products and ranges for one group of players.
+
+    These are enough to fit an ordinary least-squares line for every (x, y) feature pair in
+    closed form, and stats of disjoint groups simply add up. Stats built from_ratings also count
+    each rating value, so their ranges stay exact when players are subtracted.
+    """
+
+    def __init__(self, features, n, total, cross, lo, hi, counts=None):
+        self.features = list(features)
+        self.n = n
+        self.total = total
+        self.cross = cross
+        self.lo = lo
+        self.hi = hi
+        self.counts = counts  # (features, RATING_LEVELS) histogram, or None
+
+    @classmethod
+    def from_values(cls, features, values):
+        values = values.astype(np.float64)
+        if len(values) == 0:
+            k = len(features)
+            return cls(features, 0, np.zeros(k), np.zeros((k, k)), np.full(k, np.inf), np.full(k, -np.inf))
+        return cls(features, len(values), values.sum(axis=0), values.T @ values, values.min(axis=0),
+                   values.max(axis=0))
+
+    @classmethod
+    def from_ratings(cls, features, values):
+        """from_values for uint8 ratings, also counting how many players have each value."""
+        stats = cls.from_values(features, values)
+        k = len(features)
+        offsets = values.astype(np.intp) + np.arange(k) * RATING_LEVELS
+        stats.counts = np.bincount(offsets.ravel(), minlength=k * RATING_LEVELS).reshape(k, -1).astype(np.int32)
+        return stats
+
+    def __add__(self, other):
+        counts = self.counts + other.counts if self.counts is not None and other.counts is not None else None
+        return PairStats(self.features, self.n + other.n, self.total + other.total, self.cross + other.cross,
+                         np.minimum(self.lo, other.lo), np.maximum(self.hi, other.hi), counts)
+
+    def __sub__(self, other):
+        # Sums subtract exactly; the ranges only shrink when both sides carry rating counts
+        if self.counts is None or other.counts is None:
+            return PairStats(self.features, self.n - other.n, self.total - other.total, self.cross - other.cross,
+                             self.lo, self.hi)
+        counts = self.counts - other.counts
+        present = counts > 0
+        lo = np.where(present.any(axis=1), present.argmax(axis=1), np.inf)
+        hi = np.where(present.any(axis=1), RATING_LEVELS - 1 - present[:, ::-1].argmax(axis=1), -np.inf)
+        return PairStats(self.features, self.n - other.n, self.total - other.total, self.cross - other.cross,
+                         lo, hi, counts)
+
+    def fit(self):
+        """Slope, intercept and R² matrices where entry [x, y] regresses feature y on feature x."""
+        n = self.n
+        mean = self.total / n
+        cov = self.cross / n - np.outer(mean, mean)
+        var = np.diag(cov)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(var[:, None] > 0, cov / var[:, None], 0.0)
+            r2 = np.where(np.outer(var, var) > 0, cov ** 2 / np.outer(var, var), 0.0)
+        intercept = mean[None, :] - slope * mean[:, None]
+        return slope, intercept, r2
+
+
+class TrendTable:
+    """Closed-form fits for every feature pair of one group."""
+
+    def __init__(self, stats):
+        self.features = stats.features
+        self.n = stats.n
+        self.lo = stats.lo
+        self.hi = stats.hi
+        self.slope, self.intercept, self.r2 = stats.fit()
+        self._feature_index = {feature: i for i, feature in enumerate(self.features)}
+
+    def line(self, x_axis, y_axis, points=100):
+        """x and predicted y over the observed x range, like LinearRegression().predict()."""
+        i, j = self._feature_index[x_axis], self._feature_index[y_axis]
+        x = np.linspace(self.lo[i], self.hi[i], points)
+        return x, self.intercept[i, j] + self.slope[i, j] * x
+
+    def coefficients(self, x_axis, y_axis):
+        i, j = self._feature_index[x_axis], self._feature_index[y_axis]
+        return self.slope[i, j], self.intercept[i, j], self.r2[i, j]
+
+
+# ---- Per-dataset-version cache ----
+def _cell_codes(df):
+    gender_codes = df['Gender'].cat.codes.to_numpy()
+    league_codes = df['League_Nation'].cat.codes.to_numpy()
+    n_leagues = len(df['League_Nation'].cat.categories)
+    return gender_codes, league_codes, gender_codes.astype(np.intp) * n_leagues + league_codes
+
+
+def _cell_stats(df):
+    values = df[non_gk_features].to_numpy(dtype=np.uint8)
+    gender_codes, league_codes, cells = _cell_codes(df)
+    order = np.argsort(cells, kind='stable')
+    bounds = np.flatnonzero(np.diff(cells[order])) + 1
+    stats = {}
+    for rows in np.split(order, bounds):
+        if len(rows) == 0:
+            continue
+        gender = df['Gender'].cat.categories[gender_codes[rows[0]]]
+        league = df['League_Nation'].cat.categories[league_codes[rows[0]]]
+        stats[(gender, league)] = PairStats.from_ratings(non_gk_features, values[rows])
+    return stats
+
+
+def cell_stats(df):
+    """PairStats for every observed (Gender, League_Nation) cell, built in one pass."""
+    return cached(df, 'regression', 'cells', lambda: _cell_stats(df))
+
+
+def _update_cells(cells, key, df, added, removed):
+    cells = dict(cells)
+    for cell, stats in _cell_stats(added).items():
+        cells[cell] = cells[cell] + stats if cell in cells else stats
+    for cell, stats in _cell_stats(removed).items():
+        remaining = cells[cell] - stats
+        if remaining.n == 0:
+            del cells[cell]
+        else:
+            cells[cell] = remaining
+    return cells
+
+
+register_updater('regression', _update_cells)
+
+
+def trend_table(df, gender, leagues=None):
+    """TrendTable for one gender, restricted to ``leagues`` (None for all of them); None if no players."""
+    key = (gender, tuple(sorted(leagues)) if leagues is not None else None)
+
+    def build():
+        parts = [stats for (g, league), stats in cell_stats(df).items()
+                 if g == gender and (leagues is None or league in leagues)]
+        if not parts:
+            return None
+        total = parts[0]
+        for part in parts[1:]:
+            total = total + part
+        return TrendTable(total)
+
+    return cached(df, 'trend_table', key, build)
@@ -0,0 +1,110 @@
+"""Nearest-neighbour index for "similar players" over the full quantitative_features profile.
+
+Each player is a vector of 39 ratings, standardized per feature so that every rating counts
+alike, then scaled to unit length. The similarity of two players is the dot product of
+their rows, i.e. the cosine similarity of their standardized profiles. The float32 matrix is
+built once per dataset version, with its rows sorted by (Gender, League_Nation, Age). Any
+combination of gender, league and age band filters is then a handful of contiguous row
+ranges, found with a binary search, rather than a mask over everyone. A query is a
+matrix-vector product over those ranges, in blocks so memory stays bounded on multi-season
+data, and a partial sort keeps the k best of each block.
+"""
+import numpy as np
+import pandas as pd
+
+from aggregates import cached
+from data_loader import quantitative_features
+
+BLOCK_ROWS = 1 << 16
+
+
+def _categories_and_codes(column):
+    # Missing values (code -1) get their own slot after the last category
+    column = column.astype('category')
+    codes = column.cat.codes.to_numpy().astype(np.int64)
+    return list(column.cat.categories), np.where(codes < 0, len(column.cat.categories), codes)
+
+
+class SimilarityIndex:
+    def __init__(self, vectors, rows, bounds, genders, leagues, ages, names, teams):
+        self.vectors = vectors  # sorted by (gender, league, age)
+        self.rows = rows  # dataset row of each vector
+        self.bounds = bounds  # start of every (gender, league) cell, plus the end
+        self.genders = genders
+        self.leagues = pd.Index(leagues)
+        self.ages = ages
+        self.names = names  # by dataset row, to check a clicked row still holds the same player
+        self.teams = teams
+        self.positions = np.empty_like(rows)
+        self.positions[rows] = np.arange(len(rows))
+
+    @classmethod
+    def from_frame(cls, df, features=quantitative_features):
+        values = df[features].to_numpy(dtype=np.float32)
+        std = values.std(axis=0)
+        values = (values - values.mean(axis=0)) / np.where(std > 0, std, 1)
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values /= np.where(norms > 0, norms, 1)
+
+        genders, gender_codes = _categories_and_codes(df['Gender'])
+        leagues, league_codes = _categories_and_codes(df['League_Nation'])
+        cells = gender_codes * (len(leagues) + 1) + league_codes
+        ages = df['Age'].to_numpy(dtype=np.float32, na_value=np.nan)
+        rows = np.lexsort((ages, cells))  # unknown ages sort last within a cell
+        bounds = np.searchsorted(cells[rows], np.arange((len(genders) + 1) * (len(leagues) + 1) + 1))
+        ages = ages[rows]
+        return cls(values[rows], rows, bounds, genders, leagues, ages, df['Name'].to_numpy(dtype=object),
+                   df['Team'].to_numpy(dtype=object))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def _ranges(self, gender, leagues, age_range):
+        # Contiguous ranges of sorted rows holding the players who pass the filters
+        width = len(self.leagues) + 1
+        if gender is None:
+            genders = range(len(self.genders) + 1)
+        elif gender in self.genders:
+            genders = [self.genders.index(gender)]
+        else:
+            return []
+        if leagues is None and age_range is None:
+            return [(self.bounds[g * width], self.bounds[(g + 1) * width]) for g in genders]
+        codes = range(width) if leagues is None else np.flatnonzero(self.leagues.isin(leagues))
+        ranges = [(self.bounds[g * width + code], self.bounds[g * width + code + 1]) for g in genders for code in codes]
+        if age_range is not None:
+            ranges = [(start + np.searchsorted(self.ages[start:stop], age_range[0], 'left'),
+                       start + np.searchsorted(self.ages[start:stop], age_range[1], 'right'))
+                      for start, stop in ranges]
+        return [(start, stop) for start, stop in ranges if stop > start]
+
+    def query(self, row, k=10, gender=None, leagues=None, age_range=None):
+        """Dataset rows and similarities of the ``k`` players most similar to ``row``, best first.
+
+        ``gender`` is a Gender value, ``leagues`` a list of League_Nation values and
+        ``age_range`` an inclusive (lo, hi); None means no restriction.
+        """
+        position = self.positions[row]
+        query = self.vectors[position]
+        best_positions, best_scores = [], []
+        for range_start, range_stop in self._ranges(gender, leagues, age_range):
+            for start in range(range_start, range_stop, BLOCK_ROWS):
+                stop = min(start + BLOCK_ROWS, range_stop)
+                scores = self.vectors[start:stop] @ query
+                if start <= position < stop:
+                    scores[position - start] = -np.inf
+                top = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+                top = top[np.isfinite(scores[top])]
+                best_positions.append(top + start)
+                best_scores.append(scores[top])
+        if not best_positions:
+            return np.empty(0, dtype=self.rows.dtype), np.empty(0, dtype=np.float32)
+        positions = np.concatenate(best_positions)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return self.rows[positions[order]], scores[order]
+
+
+def similarity_index(df):
+    """Return the cached SimilarityIndex for this version of the dataset."""
+    return cached(df, 'similarity_index', None, lambda: SimilarityIndex.from_frame(df))
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+from aggregates import AgeIndex, BootstrapCI, GroupStats, cached, resample_block
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'group': pd.Categorical(rng.choice(list('abc'), n)),
+                         'Pace': rng.integers(0, 100, n, dtype=np.uint8),
+                         'Stamina': rng.integers(0, 100, n, dtype=np.uint8)})
+
+
+def test_resample_block_follows_budget():
+    assert resample_block(1000, budget=20 * 1000 * 50) == 50
+    assert resample_block(10 ** 9, budget=1 << 20) == 1
+
+
+def test_bootstrap_does_not_depend_on_block_size(monkeypatch):
+    df = _frame()
+    default = BootstrapCI.from_frame(df, 'group', ['Pace', 'Stamina'], resamples=200)
+    monkeypatch.setattr(aggregates, 'resample_block', lambda n: 7)
+    small = BootstrapCI.from_frame(df, 'group', ['Pace', 'Stamina'], resamples=200)
+    np.testing.assert_array_equal(default.lo, small.lo)
+    np.testing.assert_array_equal(default.hi, small.hi)
+
+
+def test_slow_build_does_not_block_other_entries():
+    df = _frame()
+    df.attrs['dataset_version'] = 'test-slow-build'
+    cached(df, 'ready', None, lambda: 'value')
+    started, release = threading.Event(), threading.Event()
+    builds = []
+
+    def slow():
+        builds.append(1)
+        started.set()
+        release.wait(5)
+        return 'slow'
+
+    threads = [threading.Thread(target=cached, args=(df, 'slow', None, slow)) for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    start = time.perf_counter()
+    assert cached(df, 'ready', None, lambda: 'rebuilt') == 'value'
+    assert cached(df, 'other', None, lambda: 'other') == 'other'
+    assert time.perf_counter() - start < 0.5
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert builds == [1]
+    assert cached(df, 'slow', None, lambda: 'rebuilt') == 'slow'
+
+
+def test_mask_matches_selected_rows():
+    df = _frame(5000).assign(Age=lambda frame: frame['Pace'] % 20 + 17)
+    mask = (df['Stamina'] > 40).to_numpy()
+    features = ['Pace', 'Stamina']
+    a, b = GroupStats.from_frame(df, 'group', features, mask=mask), GroupStats.from_frame(df[mask], 'group', features)
+    assert a.labels == b.labels
+    np.testing.assert_array_equal(a.total, b.total)
+    np.testing.assert_array_equal(a.count, b.count)
+    a, b = AgeIndex.from_frame(df, 'group', features, mask=mask), AgeIndex.from_frame(df[mask], 'group', features)
+    assert (a.min_age, a.max_age) == (b.min_age, b.max_age)
+    np.testing.assert_array_equal(a.total, b.total)
+    a = BootstrapCI.from_frame(df, 'group', features, resamples=50, mask=mask)
+    b = BootstrapCI.from_frame(df[mask], 'group', features, resamples=50)
+    np.testing.assert_array_equal(a.lo, b.lo)
+    np.testing.assert_array_equal(a.hi, b.hi)
+
+
+def _ages_frame():
+    df = _frame(3000)
+    return df.assign(Age=pd.array(df['Pace'].to_numpy() % 20 + 20, dtype='UInt8'))  # ages 20-39
+
+
+def _expected_mean(df, lo, hi, features, group=None):
+    rows = df[(df['Age'] >= lo) & (df['Age'] <= hi) & ((df['group'] == group) if group else True)]
+    return rows[features].astype(float).mean(), len(rows)
+
+
+def test_age_index_windows():
+    df = _ages_frame()
+    features = ['Pace', 'Stamina']
+    index = AgeIndex.from_frame(df, 'group', features)
+    # Inside, partly below, partly above, covering, fully above, fully below, a single age at each end
+    windows = [(25, 30), (10, 22), (35, 60), (0, 100), (50, 60), (5, 10), (20, 20), (39, 39), (40, 40)]
+    for lo, hi in windows:
+        for group in (None, 'a', 'c'):
+            expected, count = _expected_mean(df, lo, hi, features, group)
+            assert index.range_count(lo, hi, group) == count, (lo, hi, group)
+            pd.testing.assert_series_equal(index.range_mean(lo, hi, features, group), expected, check_names=False)
+            curve = index.curve(lo, hi, features, group)
+            assert int(sum(index.range_count(age, age, group) for age in curve.index)) == count
+
+
+def test_filtered_age_index_narrow_span():
+    # A filter leaves only a few ages; windows outside them are empty, not an error
+    df = _ages_frame()
+    mask = (df['Age'] >= 30).to_numpy() & (df['Age'] <= 32).to_numpy()
+    index = AgeIndex.from_frame(df, features=['Pace'], mask=mask)
+    assert (index.min_age, index.max_age) == (30, 32)
+    assert index.range_count(33, 45) == 0 and index.range_count(17, 29) == 0
+    assert index.range_mean(33, 45, ['Pace']).isna().all()
+    assert index.curve(33, 45, ['Pace']).empty
+    assert index.range_count(17, 31) == int(mask.sum() - (df['Age'] == 32).sum())
@@ -0,0 +1,129 @@
+"""The Arrow backend must answer every page query exactly as the pandas backend does."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import MAIN_DATA_PATH, load_ratings
+from figures import gender_scatter_figure
+from player_tags import PlayerFilter
+from query_backend import ArrowBackend, PandasBackend, export
+
+FEATURES = ['Pace', 'Stamina', 'Strength', 'Aggression']
+PLAYER_FILTER = PlayerFilter.of(['Rapid'], positions=['LW', 'RW'])
+NOBODY = PlayerFilter.of(['Rapid', 'Power Shot', 'Aerial', 'Block', 'Chip Shot', 'Long Throw'], positions=['GK'])
+
+
+@pytest.fixture(scope='module')
+def backends(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp('parquet')
+    export(str(out_dir), [MAIN_DATA_PATH])
+    return PandasBackend(load_ratings(MAIN_DATA_PATH)), ArrowBackend(str(out_dir))
+
+
+@pytest.mark.parametrize('player_filter', [None, PLAYER_FILTER, NOBODY])
+@pytest.mark.parametrize('key', ['region', 'Position'])
+def test_group_means(backends, key, player_filter):
+    pandas, arrow = backends
+    expected = pandas.group_means(key, FEATURES, player_filter)
+    actual = arrow.group_means(key, FEATURES, player_filter)
+    pd.testing.assert_frame_equal(actual, expected, check_index_type=False, check_names=False)
+
+
+@pytest.mark.parametrize('player_filter', [None, PLAYER_FILTER, NOBODY])
+def test_age_means(backends, player_filter):
+    pandas, arrow = backends
+    expected = pandas.age_means(20, 35, FEATURES, player_filter)
+    actual = arrow.age_means(20, 35, FEATURES, player_filter)
+    pd.testing.assert_frame_equal(actual, expected, check_index_type=False, check_names=False)
+
+
+@pytest.mark.parametrize('gender_filter', ['All', 'Men', 'Women'])
+def test_league_options(backends, gender_filter):
+    pandas, arrow = backends
+    assert arrow.league_options(gender_filter) == pandas.league_options(gender_filter)
+
+
+@pytest.mark.parametrize('player_filter', [None, PLAYER_FILTER])
+@pytest.mark.parametrize('leagues', [None, ['Germany'], ['England', 'Spain'], []])
+@pytest.mark.parametrize('gender_filter', ['All', 'Women'])
+def test_points_and_trend_lines(backends, gender_filter, leagues, player_filter):
+    pandas, arrow = backends
+    columns = ['Gender', 'Aggression', 'Composure', 'Name']
+    expected = pandas.points(columns, gender_filter, leagues, player_filter)
+    actual = arrow.points(columns, gender_filter, leagues, player_filter)
+    assert actual.genders == expected.genders
+    for gender in expected.genders:
+        for name in columns[1:]:
+            np.testing.assert_array_equal(actual.column(gender, name), expected.column(gender, name))
+        np.testing.assert_array_equal(actual.row_ids(gender), expected.row_ids(gender))
+
+    expected = pandas.trend_lines(gender_filter, leagues, 'Aggression', 'Composure', player_filter)
+    actual = arrow.trend_lines(gender_filter, leagues, 'Aggression', 'Composure', player_filter)
+    assert actual.keys() == expected.keys()
+    for gender in expected:
+        np.testing.assert_allclose(actual[gender], expected[gender])
+
+
+def test_no_leagues_selected(backends):
+    # An emptied league multiselect draws an empty chart with either backend
+    for backend in backends:
+        assert len(backend.points(['Gender', 'Pace'], 'All', [])) == 0
+        assert backend.trend_lines('All', [], 'Aggression', 'Composure') == {}
+        fig = gender_scatter_figure(backend, 'All', [], 'Aggression', 'Composure')
+        assert all(len(trace.x or ()) == 0 for trace in fig.data)
+
+
+@pytest.mark.parametrize('player_filter', [None, PLAYER_FILTER, NOBODY])
+def test_player_count(backends, player_filter):
+    pandas, arrow = backends
+    assert arrow.player_count(player_filter) == pandas.player_count(player_filter)
+
+
+@pytest.mark.parametrize('player_filter', [None, PLAYER_FILTER, NOBODY])
+def test_mean_ci(backends, player_filter):
+    # Arrow bootstraps only the features asked for; the intervals must still match
+    pandas, arrow = backends
+    for features in (FEATURES, ['Reactions']):
+        pairs = [(pandas.group_mean_ci('region', features, player_filter),
+                  arrow.group_mean_ci('region', features, player_filter)),
+                 (pandas.age_mean_ci(20, 35, features, player_filter),
+                  arrow.age_mean_ci(20, 35, features, player_filter))]
+        for expected, actual in pairs:
+            for lo_or_hi in (0, 1):
+                pd.testing.assert_frame_equal(actual[lo_or_hi], expected[lo_or_hi], check_index_type=False,
+                                              check_names=False)
+
+
+def test_similar_players_by_row(backends):
+    # Two players share this name and team; a click on either must look up that one
+    pandas, arrow = backends
+    df = pandas.df
+    rows = np.flatnonzero((df['Name'] == 'Matías Galarza') & (df['Team'] == 'Talleres'))
+    assert len(rows) == 2
+    results = []
+    for row in rows:
+        expected = pandas.similar_players(int(row), 'Matías Galarza', 'Talleres')
+        actual = arrow.similar_players(int(row), 'Matías Galarza', 'Talleres')
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False)
+        results.append(expected)
+    assert not results[0].equals(results[1])
+    assert pandas.similar_players(int(rows[0]), 'Matías Galarza', 'Another Team') is None
+    assert arrow.similar_players(len(df), 'Matías Galarza', 'Talleres') is None
+
+
+def test_row_ids_across_files(tmp_path, backends):
+    # With several files, a row id counts across them in order, as the similar-players frame does
+    pandas, _ = backends
+    out_dir = tmp_path / 'two'
+    out_dir.mkdir()
+    df = pandas.df
+    for i, part in enumerate((df.iloc[:5000], df.iloc[5000:])):
+        part.to_parquet(out_dir / f'part{i}.parquet', index=False, row_group_size=1000)
+    arrow = ArrowBackend(str(out_dir), batch_size=1500)
+    points = arrow.points(['Gender', 'Name', 'Team'], 'Women', ['England'])
+    expected = pandas.points(['Gender', 'Name', 'Team'], 'Women', ['England'])
+    for gender in expected.genders:
+        np.testing.assert_array_equal(points.row_ids(gender), expected.row_ids(gender))
+        row = int(points.row_ids(gender)[-1])
+        name, team = points.column(gender, 'Name')[-1], points.column(gender, 'Team')[-1]
+        assert arrow.similar_players(row, name, team) is not None
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from caching import LRUCache, SingleFlight
+
+
+def test_lru_bound_and_order():
+    cache = LRUCache(10)
+    cache.put('a', 'xxxx')
+    cache.put('b', 'xxxx')
+    assert cache.get('a') == 'xxxx'  # now the most recently used
+    cache.put('c', 'xxxx')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'xxxx' and cache.get('c') == 'xxxx'
+    cache.put('huge', 'x' * 11)
+    assert cache.get('huge') is None
+    assert cache.stats()['bytes'] == 8
+
+
+def test_build_runs_once_per_key():
+    cache = LRUCache(1 << 20)
+    calls = []
+    release = threading.Event()
+
+    def build():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build('key', build))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_slow_build_does_not_block_other_keys():
+    cache = LRUCache(1 << 20)
+    cache.put('ready', 'cached')
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'slow'
+
+    thread = threading.Thread(target=cache.get_or_build, args=('slow', slow))
+    thread.start()
+    started.wait(5)
+    start = time.perf_counter()
+    assert cache.get_or_build('ready', lambda: 'rebuilt') == 'cached'
+    assert cache.get_or_build('other', lambda: 'other') == 'other'
+    assert time.perf_counter() - start < 0.5
+    release.set()
+    thread.join()
+
+
+def test_failed_build_is_retried():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.run('key', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert flights.run('key', lambda: 1) == 1
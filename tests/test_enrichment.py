@@ -0,0 +1,48 @@
+"""The vectorised region and league lookups against the original row-by-row mapping."""
+import numpy as np
+import pandas as pd
+
+from data_loader import MAIN_DATA_PATH, read_ratings_csv
+from enrichment import DEFAULT_LEAGUE, DEFAULT_REGION, league_column, league_teams, region_column
+
+
+def _region(nation):
+    # As the dashboard first computed it, one row at a time
+    if nation in ['Egypt', 'Morocco', 'Algeria', 'Tunisia', 'Libya', 'Mauritania', 'Sudan']:
+        return 'North Africa'
+    return 'Rest of Africa' if nation in ['Nigeria', 'Senegal', 'Ghana', 'Cameroon'] else 'Rest of World'
+
+
+def _league(gender, team):
+    for league, teams in league_teams.get(gender, {}).items():
+        if team in teams:
+            return league
+    return 'Rest of the World'
+
+
+def _with_missing_values():
+    df = read_ratings_csv(MAIN_DATA_PATH)[['Nation', 'Gender', 'Team']].head(300).copy()
+    df.loc[0, 'Nation'] = np.nan
+    df.loc[1, 'Gender'] = np.nan
+    df.loc[2, 'Team'] = np.nan
+    df.loc[3, ['Nation', 'Gender', 'Team']] = np.nan
+    return df
+
+
+def test_region_matches_row_mapping():
+    df = _with_missing_values()
+    expected = [_region(nation) for nation in df['Nation']]
+    assert list(region_column(df['Nation'])) == expected
+    assert region_column(df['Nation'])[0] == DEFAULT_REGION
+    # A missing value must not take the region of the last category
+    nation = pd.Series(pd.Categorical(['Egypt', np.nan, 'France'], categories=['France', 'Egypt']))
+    assert list(region_column(nation)) == ['North Africa', DEFAULT_REGION, DEFAULT_REGION]
+
+
+def test_league_matches_row_mapping():
+    df = _with_missing_values()
+    expected = [_league(gender, team) for gender, team in zip(df['Gender'], df['Team'])]
+    leagues = league_column(df['Gender'], df['Team'])
+    assert list(leagues) == expected
+    assert all(leagues[i] == DEFAULT_LEAGUE for i in (1, 2, 3))
+    assert not pd.isna(leagues).any()
@@ -0,0 +1,24 @@
+import artifacts
+import prerender
+from data_loader import file_digest
+from manifests import file_matches, read_manifest, source_hash, write_atomic, write_manifest
+
+
+def test_write_atomic_and_manifest(tmp_path):
+    path = tmp_path / 'data.bin'
+    sha1 = write_atomic(str(path), lambda f: f.write(b'payload'))
+    assert sha1 == file_digest(str(path)) and file_matches(str(path), sha1)
+    assert not file_matches(str(tmp_path / 'missing.bin'), sha1)
+    assert [p.name for p in tmp_path.iterdir()] == ['data.bin']  # no temp file left behind
+
+    assert read_manifest(str(tmp_path)) is None
+    write_manifest(str(tmp_path), dict(files={'data.bin': sha1}))
+    assert read_manifest(str(tmp_path)) == dict(files={'data.bin': sha1})
+    (tmp_path / 'manifest.json').write_text('{broken')
+    assert read_manifest(str(tmp_path)) is None
+
+
+def test_source_hashes():
+    assert artifacts.builder_hash() == source_hash(artifacts.BUILDER_SOURCES)
+    assert prerender.renderer_hash() == source_hash(prerender.RENDER_SOURCES)
+    assert artifacts.builder_hash() != prerender.renderer_hash()
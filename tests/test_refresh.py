@@ -0,0 +1,202 @@
+"""TrackedFile.refresh against a full parse of the file, after every kind of write."""
+import csv
+import io
+import os
+
+import pandas as pd
+import pytest
+
+import aggregates
+import refresh
+from aggregates import AgeIndex, GroupStats, age_index, group_stats
+from data_loader import MAIN_DATA_PATH
+from regression import _cell_stats, cell_stats
+
+BASE_ROWS = 3000
+
+with open(MAIN_DATA_PATH, 'rb') as f:
+    HEADER, *BODY = [line for line in f.read().split(b'\r\n') if line]
+COLUMNS = next(csv.reader([HEADER.decode('utf-8-sig')]))
+
+
+def _lines(lines):
+    return b''.join(line + b'\r\n' for line in lines)
+
+
+def _edited(line, **values):
+    fields = next(csv.reader([line.decode()]))
+    for name, value in values.items():
+        fields[COLUMNS.index(name)] = value
+    out = io.StringIO()
+    csv.writer(out, lineterminator='').writerow(fields)
+    return out.getvalue().encode()
+
+
+def _append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def _rewrite(path, data):
+    # Keep the size and bump the mtime explicitly: the edit must be found from the bytes alone
+    stat = os.stat(path)
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def tracked(tmp_path):
+    path = tmp_path / 'ratings.csv'
+    path.write_bytes(_lines([HEADER] + BODY[:BASE_ROWS]))
+    tracked = refresh.TrackedFile(str(path))
+    for key in aggregates.DEFAULT_GROUP_KEYS:
+        group_stats(tracked.df, key)
+    age_index(tracked.df)
+    age_index(tracked.df, 'Gender')
+    cell_stats(tracked.df)
+    return tracked
+
+
+def assert_matches_full_parse(tracked):
+    df = tracked.df
+    full = refresh._parse(b'', refresh._read_lines(tracked.path))
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), full)
+    for key in aggregates.DEFAULT_GROUP_KEYS:
+        a, b = group_stats(df, key), GroupStats.from_frame(full, key)
+        assert list(a.labels) == list(b.labels), key
+        assert (a.count == b.count).all() and (a.total == b.total).all() and (a.total_sq == b.total_sq).all(), key
+    for split in (None, 'Gender'):
+        a, b = age_index(df, split), AgeIndex.from_frame(full, split)
+        assert (a.min_age, a.max_age) == (b.min_age, b.max_age)
+        assert (a.count == b.count).all() and (a.total == b.total).all() and (a.cum_total == b.cum_total).all()
+    a, b = cell_stats(df), _cell_stats(full)
+    assert a.keys() == b.keys()
+    for cell in a:
+        assert a[cell].n == b[cell].n and (a[cell].total == b[cell].total).all(), cell
+        assert (a[cell].cross == b[cell].cross).all(), cell
+        assert (a[cell].lo == b[cell].lo).all() and (a[cell].hi == b[cell].hi).all(), cell
+        assert (a[cell].counts == b[cell].counts).all(), cell
+
+
+def test_unchanged(tracked):
+    assert tracked.refresh() is None
+    os.utime(tracked.path)
+    version = tracked.df.attrs['dataset_version']
+    assert tracked.refresh() is None
+    assert tracked.stat_key == refresh._stat_key(tracked.path)
+    assert tracked.df.attrs['dataset_version'] == version
+
+
+def test_append_new_players(tracked):
+    _append(tracked.path, _lines(BODY[BASE_ROWS:BASE_ROWS + 500]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (500, 0)
+    assert_matches_full_parse(tracked)
+
+
+def test_append_updates(tracked):
+    updates = [_edited(line, Pace='1', Aggression='99') for line in BODY[100:300]]
+    _append(tracked.path, _lines(updates))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (200, 200)
+    assert_matches_full_parse(tracked)
+
+
+def test_partial_line(tracked):
+    line = BODY[BASE_ROWS]
+    _append(tracked.path, line[:20])
+    assert tracked.refresh() is None
+    assert tracked.stat_key == refresh._stat_key(tracked.path)  # not read again on the next poll
+    _append(tracked.path, line[20:] + b'\r\n')
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (1, 0)
+    assert_matches_full_parse(tracked)
+
+
+def test_in_place_edit_same_width(tracked):
+    # Row 6 rated 90 -> 80: same size, only the mtime and the bytes change
+    assert _edited(BODY[5]) == BODY[5] and b',90,' in BODY[5]
+    edited = _edited(BODY[5], Rating='80')
+    assert len(edited) == len(BODY[5])
+    _rewrite(tracked.path, _lines([HEADER] + BODY[:5] + [edited] + BODY[6:BASE_ROWS]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (1, 1)
+    assert added['Rating'].tolist() == [80] and removed['Rating'].tolist() == [90]
+    assert_matches_full_parse(tracked)
+
+
+def test_in_place_edit_with_append(tracked):
+    # The new rows alone would pass for an append; the edit before them must not be missed
+    edited = _edited(BODY[5], Rating='80')
+    _rewrite(tracked.path, _lines([HEADER] + BODY[:5] + [edited] + BODY[6:BASE_ROWS + 50]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (51, 1)
+    assert_matches_full_parse(tracked)
+
+
+def test_truncate_and_rewrite(tracked):
+    _rewrite(tracked.path, _lines([HEADER] + BODY[500:BASE_ROWS]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (0, 500)
+    assert_matches_full_parse(tracked)
+    _append(tracked.path, _lines(BODY[BASE_ROWS:BASE_ROWS + 10]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (10, 0)
+    assert_matches_full_parse(tracked)
+
+
+def test_truncate_to_header(tracked):
+    _rewrite(tracked.path, _lines([HEADER]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (0, BASE_ROWS)
+    assert_matches_full_parse(tracked)
+    _append(tracked.path, _lines(BODY[:10]))
+    added, removed = tracked.refresh()
+    assert (len(added), len(removed)) == (10, 0)
+    assert_matches_full_parse(tracked)
+
+
+def test_category_swap(tracked):
+    # The only player of one nation moves to a new one: the old category goes, the new one appears
+    counts = tracked.df['Nation'].value_counts()
+    lone = counts[counts == 1].index[0]
+    name = tracked.df.loc[tracked.df['Nation'] == lone, 'Name'].iloc[0]
+    line = next(line for line in BODY[:BASE_ROWS] if line.decode().startswith(name + ','))
+    _append(tracked.path, _lines([_edited(line, Nation='Atlantis')]))
+    tracked.refresh()
+    assert lone not in tracked.df['Nation'].cat.categories
+    assert 'Atlantis' in tracked.df['Nation'].cat.categories
+    assert_matches_full_parse(tracked)
+
+
+def test_current_does_not_refresh(tmp_path, monkeypatch, caplog):
+    # Requests get the published frame at once; the watcher thread applies writes and logs failures
+    path = tmp_path / 'ratings.csv'
+    path.write_bytes(_lines([HEADER] + BODY[:BASE_ROWS]))
+    calls = []
+    monkeypatch.setattr(refresh, '_watchers', set())
+    monkeypatch.setattr(refresh, '_tracked', {})
+    monkeypatch.setattr(refresh, 'start_watcher', lambda path: calls.append(path))
+    df = refresh.current(str(path))
+    _append(str(path), _lines(BODY[BASE_ROWS:BASE_ROWS + 10]))
+    assert refresh.current(str(path)) is df
+    assert calls == [str(path)] * 2
+
+    def bad_write():
+        raise ValueError('bad row')
+
+    # Each sleep starts one poll: the first refresh fails, the second applies the rows, then stop
+    tracked = refresh._tracked[str(path)]
+    polls = iter([bad_write, tracked.refresh])
+
+    def sleep(_):
+        tracked.refresh = next(polls, None)
+        if tracked.refresh is None:
+            raise SystemExit
+
+    monkeypatch.setattr(refresh.time, 'sleep', sleep)
+    with pytest.raises(SystemExit):
+        refresh._watch(str(path), 1)
+    assert "Refreshing" in caplog.text and 'bad row' in caplog.text
+    assert len(refresh.current(str(path))) == BASE_ROWS + 10
@@ -0,0 +1,59 @@
+"""The closed-form trendlines must match the scikit-learn fit the dashboard used to run per rerun."""
+import numpy as np
+import pytest
+
+from data_loader import MAIN_DATA_PATH, load_ratings
+from player_tags import PlayerFilter
+from query_backend import PandasBackend
+from regression import PairStats, TrendTable
+
+LinearRegression = pytest.importorskip('sklearn.linear_model').LinearRegression
+
+AXES = [('Pace', 'Stamina'), ('Strength', 'Aggression'), ('Dribbling', 'Ball Control')]
+
+
+@pytest.fixture(scope='module')
+def df():
+    return load_ratings(MAIN_DATA_PATH)
+
+
+def _sklearn_line(data, x_axis, y_axis):
+    x = data[x_axis].to_numpy(dtype=np.float64).reshape(-1, 1)
+    y = data[y_axis].to_numpy(dtype=np.float64)
+    model = LinearRegression().fit(x, y)
+    x_range = np.linspace(x.min(), x.max(), 100).reshape(-1, 1)
+    return model, x_range.ravel(), model.predict(x_range)
+
+
+@pytest.mark.parametrize('x_axis, y_axis', AXES)
+def test_coefficients_match_sklearn(df, x_axis, y_axis):
+    for gender in df['Gender'].cat.categories:
+        data = df[df['Gender'] == gender]
+        table = TrendTable(PairStats.from_values([x_axis, y_axis], data[[x_axis, y_axis]].to_numpy()))
+        model, _, _ = _sklearn_line(data, x_axis, y_axis)
+        slope, intercept, r2 = table.coefficients(x_axis, y_axis)
+        np.testing.assert_allclose(slope, model.coef_[0], rtol=1e-9)
+        np.testing.assert_allclose(intercept, model.intercept_, rtol=1e-9)
+        x = data[[x_axis]].to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(r2, model.score(x, data[y_axis].to_numpy(dtype=np.float64)), rtol=1e-9)
+
+
+@pytest.mark.parametrize('player_filter', [None, PlayerFilter.of(['Rapid'], positions=['LW', 'RW'])])
+@pytest.mark.parametrize('leagues', [None, ['Germany'], ['England', 'Spain']])
+@pytest.mark.parametrize('x_axis, y_axis', AXES)
+def test_trend_lines_match_sklearn(df, x_axis, y_axis, leagues, player_filter):
+    backend = PandasBackend(df)
+    lines = backend.trend_lines('All', leagues, x_axis, y_axis, player_filter)
+    mask = np.ones(len(df), dtype=bool)
+    if leagues is not None:
+        mask &= df['League_Nation'].isin(leagues).to_numpy()
+    if player_filter is not None:
+        mask &= player_filter.mask(df)
+    filtered = df[mask]
+    expected_genders = [g for g in filtered['Gender'].cat.categories if (filtered['Gender'] == g).any()]
+    assert sorted(lines) == sorted(expected_genders)
+    for gender in expected_genders:
+        _, x_range, y_pred = _sklearn_line(filtered[filtered['Gender'] == gender], x_axis, y_axis)
+        x, y = lines[gender]
+        np.testing.assert_allclose(x, x_range, rtol=1e-12)
+        np.testing.assert_allclose(y, y_pred, rtol=1e-9)
@@ -0,0 +1,58 @@
+import importlib
+import sys
+import time
+
+import instrumentation
+
+# Page name -> module. Modules are imported on first visit, so a page only pays for the
+# libraries and data it actually uses (Home needs neither pandas nor plotly).
+PAGES = {
+    "Home": "views.home",
+    "Africa": "views.africa",
+    "Men vs Women": "views.men_vs_women",
+    "Ages": "views.ages",
+}
+
+# First render of each page in this process: import time and time until the page finished drawing
+startup_timings = {}
+
+
+def render_page(page):
+    start = time.perf_counter()
+    module = importlib.import_module(PAGES[page])
+    imported = time.perf_counter()
+    with instrumentation.rerun(page) as spans:
+        try:
+            module.render()
+        finally:
+            if page not in startup_timings:
+                startup_timings[page] = dict(import_s=imported - start, first_paint_s=time.perf_counter() - start)
+    if spans is not None:
+        debug_panel(page, spans)
+
+
+def session_bytes(state):
+    """Rough size of one session's own state: widget values and the saved league selection."""
+    total = 0
+    for value in state.values():
+        total += sys.getsizeof(value)
+        if isinstance(value, (list, tuple)):
+            total += sum(sys.getsizeof(item) for item in value)
+    return total
+
+
+def debug_panel(page, spans):
+    import streamlit as st
+
+    instrumentation.set_memory('session_state', session_bytes(st.session_state.to_dict()))
+    memory_rows = [f"| {kind} | {nbytes / 1024:.1f} |" for kind, nbytes in sorted(instrumentation.memory().items())]
+    rows = [f"| {stage} | {seconds * 1000:.1f} |" for stage, seconds in spans]
+    history = instrumentation.summary()
+    history_rows = [f"| {stage} | {s['count']} | {s['p50'] * 1000:.1f} | {s['p95'] * 1000:.1f} |"
+                    for (p, stage), s in sorted(history.items()) if p == page]
+    with st.sidebar.expander("Rerun timings", expanded=False):
+        st.markdown("**This rerun**\n\n| stage | ms |\n|---|---:|\n" + "\n".join(rows))
+        st.markdown("**All reruns of this page**\n\n| stage | n | p50 ms | p95 ms |\n|---|---:|---:|---:|\n" +
+                    "\n".join(history_rows))
+        st.markdown("**Memory** (dataset, shared columns and figure cache are per process; the rest per "
+                    "session)\n\n| pool | KB |\n|---|---:|\n" + "\n".join(memory_rows))
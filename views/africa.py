@@ -0,0 +1,47 @@
+import streamlit as st
+
+from data_loader import quantitative_features
+from figure_cache import page_figure
+from instrumentation import span
+from views.common import load_backend, player_filter_widgets
+
+
+def render():
+    st.title("Regional Physical Abilities")
+    backend = load_backend()
+
+    all_options = quantitative_features[:]
+    selected_features = st.multiselect("Select Feature:", ['All'] + all_options,
+                                       default=['Pace', 'Stamina', 'Strength', 'Aggression'])
+
+    if 'All' in selected_features and len(selected_features) > 1:
+        st.error(
+            "You cannot select 'All' and other features at the same time. Please choose either 'All' or specific features.")
+        st.stop()
+
+    if 'All' in selected_features:
+        selected_features = all_options
+
+    if not selected_features:
+        st.warning("Please select at least 1 feature.")
+        st.stop()
+
+    error_bars = st.checkbox("Show 95% confidence intervals", value=False)
+    player_filter = player_filter_widgets(backend)
+
+    fig = page_figure(backend, 'Africa', features=selected_features, error_bars=error_bars,
+                      player_filter=player_filter)
+    with span('plotly_chart'):
+        st.plotly_chart(fig)
+
+    st.markdown("""
+    ### Explanation:
+    This graph shows the average values of selected physical features for players from different regions — specifically, North Africa, other parts of Africa, and the rest of the world. It allows comparison of how physical attributes such as pace, stamina, strength, and aggression differ across geographic groups.
+
+    **Insights:** Players from central and southern parts of Africa tend to have slightly higher average ratings in strength and aggression, while players from North Africa show higher values in pace. These patterns may reflect trends in data collection, scouting, or representation within football databases. Players from central and southern parts of Africa tend to have slightly higher average ratings in strength and aggression, while players from North Africa show higher values in pace. These patterns may reflect trends in data collection, scouting, or representation within football databases.
+    """)
+
+    st.markdown("""
+    ### How to use
+    Use the feature selector to compare physical characteristics across regions. North and Sub-Saharan Africa show different strengths. Try comparing fewer attributes for clarity. Turn on the confidence intervals to see how much each average could move with a different sample of players: North Africa has far fewer players than the other groups.
+    """)
@@ -0,0 +1,47 @@
+import streamlit as st
+
+from data_loader import non_gk_features
+from figure_cache import page_figure
+from instrumentation import span
+from views.common import load_backend, player_filter_widgets
+
+
+def render():
+    st.title("Age-Based Performance")
+    backend = load_backend()
+    age_range = st.slider("Select Age Range:", 17, 43, (17, 43))
+
+    selected_features = st.multiselect("Select features:", ['All'] + non_gk_features,
+                                       default=['Pace', 'Stamina', 'Reactions', 'Strength'])
+
+    if 'All' in selected_features and len(selected_features) > 1:
+        st.error(
+            "You cannot select 'All' and other features at the same time. Please choose either 'All' or specific features.")
+        st.stop()
+
+    if 'All' in selected_features:
+        selected_features = non_gk_features
+
+    if not selected_features:
+        st.warning("Please select at least one feature.")
+        st.stop()
+
+    error_bars = st.checkbox("Show 95% confidence intervals", value=False)
+    player_filter = player_filter_widgets(backend)
+
+    fig = page_figure(backend, 'Ages', age_range=age_range, features=selected_features, error_bars=error_bars,
+                      player_filter=player_filter)
+    with span('plotly_chart'):
+        st.plotly_chart(fig)
+
+    st.markdown("""
+    ### Explanation:
+    This line chart illustrates how different player abilities evolve with age. It focuses on non-goalkeepers and tracks selected attributes over a user-defined age range.
+
+    **Insights:** Physical abilities such as pace and stamina tend to decline as age increases, while features like reactions may remain stable or improve.
+    """)
+
+    st.markdown("""
+    ### How to use
+    Examine how physical and mental features evolve with player age. Filter the range to identify age peaks for different abilities. The confidence intervals widen at the oldest ages, where only a handful of players remain.
+    """)
@@ -0,0 +1,42 @@
+import streamlit as st
+
+import instrumentation
+from figure_cache import figure_cache, warm_figure_cache
+from instrumentation import span
+from player_tags import PLAYSTYLES, POSITIONS, PlayerFilter
+from query_backend import get_backend
+
+
+def load_backend():
+    # pandas: the typed dataset, memoized and shared across sessions (see data_loader.py);
+    # arrow: Parquet files scanned on demand (see query_backend.py)
+    with span('load'):
+        backend = get_backend()
+    with span('aggregate'):
+        backend.warm()
+    # Default views of every page are built off the request path
+    warm_figure_cache(backend, background=True)
+    if instrumentation.ENABLED:
+        for kind, nbytes in backend.memory_bytes().items():
+            instrumentation.set_memory(kind, nbytes)
+        instrumentation.set_memory('figure_cache', figure_cache.stats()['bytes'])
+    return backend
+
+
+def player_filter_widgets(backend):
+    """The PlayStyle / position filter offered on every page; returns a PlayerFilter or None.
+
+    The widget keys are the same on every page, so a filter stays on when switching pages.
+    """
+    with st.expander("Filter players by PlayStyle or position"):
+        playstyles = st.multiselect("Has all of these PlayStyles:", PLAYSTYLES, key='filter_playstyles')
+        playstyles_plus = st.multiselect("Has all of these as PlayStyle+:", PLAYSTYLES, key='filter_playstyles_plus')
+        positions = st.multiselect("Can play any of these positions:", POSITIONS, key='filter_positions')
+    player_filter = PlayerFilter.of(playstyles, playstyles_plus, positions)
+    if player_filter is not None:
+        count = backend.player_count(player_filter)
+        if count == 0:
+            st.warning("No players match the PlayStyle/position filter.")
+            st.stop()
+        st.caption(f"Showing the {count} players who match: {player_filter.describe()}.")
+    return player_filter
@@ -0,0 +1,15 @@
+import streamlit as st
+
+
+def render():
+    st.title("Reflecting Stereotypes in Football Using EA FC 25 Data")
+    st.write("""
+    ### Introduction
+    This dashboard explores how player attributes in EA FC 25 may reflect or reinforce stereotypes based on ethnicity, gender, and age.
+
+    ---
+    ### Dashboard Overview
+    1. **Africa - Regional Physical Abilities**
+    2. **Men vs Women - Gendered Attributes**
+    3. **Ages - Age-Based Performance**
+    """)
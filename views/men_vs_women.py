@@ -0,0 +1,89 @@
+import streamlit as st
+
+from data_loader import non_gk_features
+from figure_cache import page_figure
+from instrumentation import span
+from views.common import load_backend, player_filter_widgets
+
+
+def similar_players(backend, row, name, team):
+    st.subheader(f"Players most similar to {name} ({team})")
+    gender_col, league_col, age_col = st.columns(3)
+    gender_filter = gender_col.selectbox("Gender:", ["All", "Men", "Women"], key='similar_gender')
+    leagues = league_col.multiselect("Leagues:", backend.league_options(gender_filter), key='similar_leagues')
+    age_range = age_col.slider("Age:", 17, 43, (17, 43), key='similar_ages')
+
+    with span('similar_players'):
+        similar = backend.similar_players(row, name, team, 10, gender_filter, leagues or None, age_range)
+    if similar is None:
+        st.info(f"{name} ({team}) is no longer in the dataset.")
+    elif similar.empty:
+        st.info("No players match these filters.")
+    else:
+        st.dataframe(similar.rename(columns={'League_Nation': 'League'}), hide_index=True,
+                     column_config={'Similarity': st.column_config.NumberColumn(format="%.3f")})
+
+
+def render():
+    st.title("Gender-Based Attributes Analysis")
+    backend = load_backend()
+
+    # Step 1: Gender filter
+    gender_filter = st.selectbox("Filter by Gender:", ["All", "Men", "Women"], index=0)
+
+    # Step 2: Get league options based on gender (League_Nation is precomputed at load)
+    league_options = ['All'] + backend.league_options(gender_filter)
+
+    # Step 3: Use session_state to preserve selected leagues
+    if 'selected_leagues' not in st.session_state:
+        st.session_state.selected_leagues = ['Germany']  # default league on first load
+
+    # Clean the saved selection in case it no longer exists in new options
+    valid_leagues = [l for l in st.session_state.selected_leagues if l in league_options]
+    if not valid_leagues:
+        valid_leagues = ['All']  # fallback default
+
+    # Step 4: Leagues multiselect
+    selected_leagues = st.multiselect("Select Leagues:", league_options, default=valid_leagues)
+    st.session_state.selected_leagues = selected_leagues
+
+    # Step 5: Prevent "All" with others
+    if 'All' in selected_leagues and len(selected_leagues) > 1:
+        st.error(
+            "You cannot select 'All' and other leagues at the same time. Please choose either 'All' or specific leagues.")
+        st.stop()
+
+    x_axis = st.selectbox("Select X-axis Attribute:", non_gk_features, index=non_gk_features.index('Aggression'))
+    y_axis = st.selectbox("Select Y-axis Attribute:", non_gk_features, index=non_gk_features.index('Composure'))
+
+    # Full detail sends every player (WebGL above figures.WEBGL_THRESHOLD points); aggregated
+    # collapses identical (x, y) ratings into one marker per gender with a player count
+    point_detail = st.radio("Point Detail:", ["Full detail", "Aggregated"], horizontal=True)
+    render_mode = 'aggregated' if point_detail == "Aggregated" else 'auto'
+
+    player_filter = player_filter_widgets(backend)
+
+    leagues = None if 'All' in selected_leagues else selected_leagues
+    fig = page_figure(backend, 'Men vs Women', gender_filter=gender_filter, leagues=leagues, x_axis=x_axis,
+                      y_axis=y_axis, render_mode=render_mode, player_filter=player_filter)
+    with span('plotly_chart'):
+        event = st.plotly_chart(fig, key='gender_scatter', on_select="rerun", selection_mode="points")
+
+    # Clicking a player (full detail only; aggregated markers are cells, not players) lists their nearest neighbours
+    picked = [point['customdata'] for point in event['selection']['points'] if point.get('customdata')]
+    if picked:
+        name, team, row = picked[0][:3]
+        similar_players(backend, int(row), name, team)
+
+    st.markdown("""
+    ### Explanation:
+    This scatter plot compares any two attributes by gender and league. Trendlines highlight overall patterns in male and female footballers.
+
+    **Insights:** You might notice that certain attributes (like aggression or composure) trend differently by gender.
+    """)
+
+    st.markdown("""
+    ### How to use
+    Explore differences in player attributes across genders and leagues. Use the trendlines to identify overall tendencies.
+    In full detail, click a player to list the ten players whose 39 ratings are most alike, optionally restricted to a gender, leagues or an age band.
+    """)